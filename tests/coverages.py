@@ -14,6 +14,7 @@ Possible COMMANDs:
 Expected ARGS:
     - simple_poisson: THETAs Bs CLs NTEST
     - simple_gauss: MUs SIGMAs CLs NTEST
+      NTEST can be `exact` to calculate the coverage analytically.
     - hybrid_poisson: THETAs Bs GAMMAs CLs NTEST
     - plot, hist, cdf: FILEPATH
 
@@ -29,6 +30,9 @@ The header lines are prefixed with '#'. Comments can be added or lines can
 be commented by prefixing with '!'. Preceding whitespaces are *not*
 stripped!
 
+The last column is the number of covering intervals out of NTEST tests,
+or the coverage itself for `ntest: 'exact'`.
+
 """
 from __future__ import division, print_function
 import sys
@@ -39,6 +43,7 @@ import numpy as np
 import context
 from unified_ci.simple_poisson import confidence_interval as simpoi_ci
 from unified_ci.simple_gaussian import confidence_interval as simgau_ci
+from unified_ci.simple_gaussian import coverage as simgau_coverage
 from unified_ci.hybrid_poisson import confidence_interval as hybpoi_ci
 
 
@@ -104,10 +109,24 @@ def _mp_target_simple_gauss(args):
             n_succ += 1
     return mu, sigma, cl, n_succ
 
+def simple_gauss_exact(mu, sigma, cl):
+    print("# mu:    {0!r}".format(mu))
+    print("# sigma: {0!r}".format(sigma))
+    print("# cl:    {0!r}".format(cl))
+    print("# ntest: 'exact'")
+    print("# mu  sigma  cl  coverage")
+
+    grid = np.array(list(product(mu, sigma, cl)))
+    cov = simgau_coverage(grid[:,0], grid[:,1], grid[:,2])
+    for r, c in zip(grid, cov):
+        print("{:.5e}  {:.5e}  {:.5e}  {:.10f}".format(r[0], r[1], r[2], c))
+
 def simple_gauss(mus, sigmas, cls, ntest):
     mu = parse_arg(mus, "MUs")
     sigma = parse_arg(sigmas, "SIGMAs")
     cl = parse_arg(cls, "CLs")
+    if ntest == "exact":
+        return simple_gauss_exact(mu, sigma, cl)
     try:
         N_mc = int(ntest)
     except ValueError:
@@ -191,16 +210,21 @@ def load_coverage_file(path):
         vals = np.loadtxt(fd, comments="!")
     return params, colnames, vals
 
-def calc_cl_uncertainty(taplrget_cl, N_mc):
+def is_exact(params):
+    """Whether the coverage file holds exact coverages instead of MC counts."""
+    return params["ntest"] == "exact"
+
+def calc_cl_uncertainty(target_cl, N_mc):
     """Calculate uncertainty of CL estimated from binomial distribution."""
-    print(target_cl, N_mc)
     return np.sqrt(target_cl * (1 - target_cl) / N_mc)
 
 def plot(path):
     params, colnames, vals = load_coverage_file(path)
     from matplotlib import pyplot as plt
 
-    n_MC = params["ntest"]
+    # exact coverages are plotted as fractions
+    exact = is_exact(params)
+    n_MC = 1 if exact else params["ntest"]
     all_target_cls = set()
 
     plt.figure()
@@ -231,13 +255,14 @@ def plot(path):
 
 
     for target_cl in all_target_cls:
-        delta_cl = calc_cl_uncertainty(target_cl, n_MC)
         plt.axhline(target_cl * n_MC, color="g")
-        plt.axhspan(n_MC * (target_cl - delta_cl), n_MC * (target_cl + delta_cl), alpha=0.5, color="g")
+        if not exact:
+            delta_cl = calc_cl_uncertainty(target_cl, n_MC)
+            plt.axhspan(n_MC * (target_cl - delta_cl), n_MC * (target_cl + delta_cl), alpha=0.5, color="g")
 
 
     plt.xticks(range(len(upars)), [repr(u) for u in upars], rotation=90)
-    plt.ylabel("# of properly covering intervals")
+    plt.ylabel("coverage" if exact else "# of properly covering intervals")
     plt.xlabel("-".join(colnames[:-2]) + " combinations")
     plt.xlim((-0.5, len(upars)-0.5))
     plt.yscale("log")
@@ -250,12 +275,16 @@ def hist(path):
     from scipy.stats import binom
 
     # Prepare binning
-    n_MC = params["ntest"]
-    n_min = min(n_MC * min(params["cl"]), vals[:,-1].min())
-    bin_centers = np.arange(n_min, n_MC + 1)
-    bins = np.empty((bin_centers.size + 1,))
-    bins[:bin_centers.size] = bin_centers - 0.5
-    bins[-1] = bin_centers[-1] + 0.5
+    exact = is_exact(params)
+    if exact:
+        bins = np.linspace(min(min(params["cl"]), vals[:,-1].min()), 1.0, 51)
+    else:
+        n_MC = params["ntest"]
+        n_min = min(n_MC * min(params["cl"]), vals[:,-1].min())
+        bin_centers = np.arange(n_min, n_MC + 1)
+        bins = np.empty((bin_centers.size + 1,))
+        bins[:bin_centers.size] = bin_centers - 0.5
+        bins[-1] = bin_centers[-1] + 0.5
 
     plt.figure()
     plt.title("coverage histogram {}".format(path))
@@ -265,10 +294,13 @@ def hist(path):
         n_cov = vals[idx,-1]
 
         plt.hist(n_cov, bins, normed=True, histtype="step", color=col, linestyle=ls, linewidth=3, label="{0:.5f}".format(targ_cl))
-        plt.plot(bin_centers, binom.pmf(bin_centers, n_MC, targ_cl), color=col, linestyle=ls, marker="o", mew=0)
+        if exact:
+            plt.axvline(targ_cl, color=col, linestyle=ls)
+        else:
+            plt.plot(bin_centers, binom.pmf(bin_centers, n_MC, targ_cl), color=col, linestyle=ls, marker="o", mew=0)
 
     plt.legend(loc="best", title="target CL")
-    plt.xlabel("#(covered)")
+    plt.xlabel("coverage" if exact else "#(covered)")
     plt.ylabel("frequency")
     plt.show()
 
@@ -279,9 +311,13 @@ def cdf(path):
     from statsmodels.distributions import ECDF
 
     # Prepare binning
-    n_MC = params["ntest"]
-    n_min = min(n_MC * min(params["cl"]), vals[:,-1].min())
-    bin_centers = np.arange(n_min, n_MC + 1)
+    exact = is_exact(params)
+    if exact:
+        bin_centers = np.linspace(min(min(params["cl"]), vals[:,-1].min()), 1.0, 201)
+    else:
+        n_MC = params["ntest"]
+        n_min = min(n_MC * min(params["cl"]), vals[:,-1].min())
+        bin_centers = np.arange(n_min, n_MC + 1)
 
     plt.figure()
     plt.title("coverage histogram {}".format(path))
@@ -293,10 +329,13 @@ def cdf(path):
         plt.plot(bin_centers, ecdf(bin_centers),
                  color=col, linestyle=ls, linewidth=3,
                  label="{0:.5f}".format(targ_cl))
-        plt.plot(bin_centers, binom.cdf(bin_centers, n_MC, targ_cl), color=col, linestyle=ls, marker="o", mew=0)
+        if exact:
+            plt.axvline(targ_cl, color=col, linestyle=ls)
+        else:
+            plt.plot(bin_centers, binom.cdf(bin_centers, n_MC, targ_cl), color=col, linestyle=ls, marker="o", mew=0)
 
     plt.legend(loc="best", title="target CL")
-    plt.xlabel("#(covered)")
+    plt.xlabel("coverage" if exact else "#(covered)")
     plt.ylabel("cumulative frequency (CDF)")
     plt.show()
 
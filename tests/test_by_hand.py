@@ -36,8 +36,7 @@ def print_FC_Gaussian_tables():
     clvls = (0.6827, 0.90, 0.95, 0.99)
     tmpl = "{: .1f}  " + "  ".join(["{:.3f},{:.3f}"] * len(clvls))
     for xi in np.arange(-3.0, 3.15, 0.1):
-        ll = [simple_gaussian.lower_limit(xi, 1.0, cl) for cl in clvls]
-        ul = [simple_gaussian.upper_limit(xi, 1.0, cl) for cl in clvls]
+        ll, ul = simple_gaussian.confidence_interval(xi, 1.0, clvls)
         print tmpl.format(xi, *list(chain.from_iterable(izip(ll, ul))))
 
 
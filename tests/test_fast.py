@@ -1,7 +1,15 @@
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+import numpy as np
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 
 import context
-from unified_ci import tools, simple_gaussian, simple_poisson
+from unified_ci import tools, simple_gaussian, simple_poisson, hybrid_poisson, poisson_table
 
 class TestTools(unittest.TestCase):
     def test_bisect(self):
@@ -22,20 +30,206 @@ class TestTools(unittest.TestCase):
                 tools.bisect(dummy_f, 2, -1, xtol=1e-3),
                 3)
 
-    def DIStest_conservative_quantile(self):
+    def test_bisect_batch(self):
+        # Vectorized version of the dummy function in `test_bisect`, with
+        # the plateau shifted element-wise by `s`.
+        def dummy_f(x, s):
+            x = x - s
+            return np.where(x < 0, 1.0, np.where(x < 1, 0.0, -1.0))
+
+        s = np.array([0.0, 0.5, -2.0])
+        r = tools.bisect_batch(dummy_f, [-1.0, -1.0, -4.0], 2.0, xtol=1e-3, args=(s,))
+        np.testing.assert_allclose(r, s, atol=1e-3)
+
+        r = tools.bisect_batch(dummy_f, 2.0, [-1.0, -1.0, -4.0], xtol=1e-3, args=(s,))
+        np.testing.assert_allclose(r, s + 1, atol=1e-3)
+
+        # Scalar brackets are consistent with `bisect`.
+        def scalar_f(x):
+            return x**2 - 2.0
+        self.assertAlmostEqual(tools.bisect(scalar_f, 0.0, 2.0, xtol=1e-6),
+                               tools.bisect_batch(scalar_f, 0.0, 2.0, xtol=1e-6)[()],
+                               12)
+
+        self.assertRaises(ValueError, tools.bisect_batch, scalar_f, [0.0, 2.0], 3.0)
+
+        # Scalar brackets are broadcast against array arguments.
+        r = tools.bisect_batch(lambda x, c: x - c, 0.0, 10.0, xtol=1e-6, args=(np.array([1.0, 2.0, 3.0]),))
+        np.testing.assert_allclose(r, [1.0, 2.0, 3.0], atol=1e-6)
+
+    def test_illinois_batch(self):
+        # Same plateau semantics as `bisect_batch` (see `test_bisect_batch`).
+        def dummy_f(x, s):
+            x = x - s
+            return np.where(x < 0, 1.0, np.where(x < 1, 0.0, -1.0))
+
+        s = np.array([0.0, 0.5, -2.0])
+        r = tools.illinois_batch(dummy_f, [-1.0, -1.0, -4.0], 2.0, xtol=1e-3, args=(s,))
+        np.testing.assert_allclose(r, s, atol=1e-3)
+
+        r = tools.illinois_batch(dummy_f, 2.0, [-1.0, -1.0, -4.0], xtol=1e-3, args=(s,))
+        np.testing.assert_allclose(r, s + 1, atol=1e-3)
+
+        # Smooth functions need fewer evaluations than bisection.
+        calls = []
+        def smooth_f(x, c):
+            calls.append(x.size)
+            return x**3 - c
+
+        c = np.array([2.0, 5.0, 0.1])
+        r_bisect = tools.bisect_batch(smooth_f, np.zeros(3), 3.0, xtol=1e-12, ftol=0.0, args=(c,))
+        n_bisect = sum(calls)
+        del calls[:]
+        r_illinois = tools.illinois_batch(smooth_f, np.zeros(3), 3.0, xtol=1e-12, ftol=0.0, args=(c,))
+        np.testing.assert_allclose(r_illinois, c**(1/3.), atol=1e-12)
+        np.testing.assert_allclose(r_illinois, r_bisect, atol=1e-12)
+        self.assertLess(sum(calls), n_bisect // 2)
+
+        self.assertRaises(ValueError, tools.illinois_batch, smooth_f, [2.0, 0.0], 3.0, args=(1.0,))
+
+    def test_ksection(self):
+        # Same plateau semantics as `bisect` (see `test_bisect`).
+        def dummy_f(x):
+            if x < 0 :
+                return 1
+            elif x < 1:
+                return 0
+            else:
+                return -1
+
+        pool = ThreadPool(3)
+        try:
+            self.assertAlmostEqual(0, tools.ksection(dummy_f, -1, 2, k=3, executor=pool, xtol=1e-3), 3)
+            self.assertAlmostEqual(1, tools.ksection(dummy_f, 2, -1, k=3, executor=pool, xtol=1e-3), 3)
+            # `k` defaults to the number of workers
+            self.assertEqual(3, tools._n_workers(pool))
+        finally:
+            pool.close()
+
+        # k=1 without executor is plain bisection.
+        def scalar_f(x, c):
+            return x**2 - c
+        self.assertEqual(tools.bisect(scalar_f, 0.0, 2.0, xtol=1e-6, args=(2.0,)),
+                         tools.ksection(scalar_f, 0.0, 2.0, xtol=1e-6, args=(2.0,)))
+
+        self.assertRaises(ValueError, tools.ksection, scalar_f, 0.0, 1.0, args=(2.0,))
+
+    def test_upper_bracket(self):
+        calls = []
+        def f(x):
+            calls.append(x)
+            return 5.3 - x
+
+        # Reference: doubling search (evaluating 1, 2, 4, 8) followed by
+        # bisection of [4, 8].
+        r_ref = tools.bisect(f, 4.0, 8.0, xtol=1e-6)
+        n_ref = len(set(calls)) + 2
+
+        for guess in (0.1, 4.5, 5.3, 7.9, 20.0):
+            u, v = tools.upper_bracket(f, 0.0, 1.0, guess, 0.3)
+            self.assertEqual(r_ref, tools.bisect(f, u, v, xtol=1e-6))
+
+        del calls[:]
+        u, v = tools.upper_bracket(f, 0.0, 1.0, 5.3, 0.3)
+        self.assertLessEqual(v - u, 0.3)
+        tools.bisect(f, u, v, xtol=1e-6)
+        self.assertLess(len(set(calls)), n_ref)
+
+    def test_bisection_bracket(self):
+        f = lambda x: 5.3 - x
+        for a, b in ((0.0, 16.0), (16.0, 0.0)):
+            r_ref = tools.bisect(f, a, b, xtol=1e-6)
+            for guess in (-1.0, 2.0, 5.3, 5.9, 20.0):
+                u, v = tools.bisection_bracket(f, a, b, guess, 0.3)
+                self.assertEqual(r_ref, tools.bisect(f, u, v, xtol=1e-6))
+            u, v = tools.bisection_bracket(f, a, b, 5.4, 0.3)
+            self.assertLessEqual(abs(v - u), 0.3)
+
+    def test_memoize(self):
+        calls = []
+        @tools.memoize(maxsize=2)
+        def f(x):
+            calls.append(x)
+            return 2 * x
+
+        self.assertEqual([2.0, 4.0, 2.0], [f(1.0), f(2.0), f(1.0)])
+        self.assertEqual((1, 2, 2, 2), tuple(f.cache_info()))
+        # 2.0 is the least recently used and gets evicted
+        f(3.0)
+        f(2.0)
+        self.assertEqual([1.0, 2.0, 3.0, 2.0], calls)
+        f.cache_clear()
+        self.assertEqual((0, 0, 2, 0), tuple(f.cache_info()))
+
+        @tools.memoize(decimals=3)
+        def g(x, k):
+            return x * k
+        self.assertEqual(2.0, g(1.0, 2))
+        self.assertEqual(2.0, g(1.0001, 2))
+        self.assertEqual(6.0, g(1.0, 6))
+        self.assertEqual((1, 2, 1024, 2), tuple(g.cache_info()))
+
+    def test_conservative_quantile(self):
         data1 = 10 * [0.0] + 50 * [1.0] + 40 * [1.1]
 
         test_cases = (
                 # (expected_result, probability)
                 (0.0, 0.09),
                 (1.0, 0.11),
-                (0.0, 0.1)
+                (0.0, 0.1),
+                (1.1, 1.0),
+                (1.0, -0.6),
+                (0.0, -0.59),
+                (1.1, -1.0),
                 )
 
-        # Test with ordered data.
-        for r, p, d in test_cases:
-            self.assertEqual(r, tools.conservative_quantile(data1, p, d)[0],
-                    "conservative_quantile test failed for r={} p={} d={}".format(r, p, d))
+        # Test with ordered and shuffled data.
+        for d in (data1, np.random.permutation(data1)):
+            for r, p in test_cases:
+                self.assertEqual(r, tools.conservative_quantile(d, p),
+                        "conservative_quantile test failed for r={} p={}".format(r, p))
+
+        ps = [r[1] for r in test_cases]
+        np.testing.assert_array_equal([r[0] for r in test_cases],
+                                      tools.conservative_quantile(data1, ps))
+
+    def test_conservative_quantile_axis(self):
+        # Compare against the cumulative frequency definition.
+        def reference(x, p):
+            items, freqs = np.unique(x, return_counts=True)
+            cumfreq = np.cumsum(freqs) / float(x.size)
+            i = np.where(cumfreq >= abs(p))[0][0]
+            if p < 0 and cumfreq[i] != abs(p):
+                i -= 1
+            return items[i]
+
+        x = np.random.poisson(3.0, size=(5, 200))
+        ps = [0.05, 0.5, 0.95, -0.05, -0.5, -0.95]
+        q = tools.conservative_quantile(x, ps, axis=1)
+        self.assertEqual((len(ps), 5), q.shape)
+        np.testing.assert_array_equal(q, tools.conservative_quantile(x.T, ps, axis=0))
+        for i, p in enumerate(ps):
+            for j in range(x.shape[0]):
+                self.assertEqual(reference(x[j], p), q[i, j])
+
+    def test_quantile_accumulator(self):
+        x = np.random.poisson(3.0, size=1000) / 7.0
+        ps = [0.0, 0.05, 0.5, 0.95, 1.0, -0.05, -0.5, -0.95, -1.0]
+
+        acc = tools.QuantileAccumulator()
+        for chunk in np.array_split(x, 7):
+            acc.add(chunk)
+        self.assertEqual(x.size, acc.size)
+        np.testing.assert_array_equal(tools.conservative_quantile(x, ps),
+                                      acc.quantile(ps))
+
+        # Partial accumulators give the same result when merged.
+        acc1 = tools.QuantileAccumulator(x[:300])
+        acc2 = tools.QuantileAccumulator(x[300:])
+        acc1.merge(acc2)
+        np.testing.assert_array_equal(acc.values, acc1.values)
+        np.testing.assert_array_equal(acc.counts, acc1.counts)
+        self.assertEqual(tools.conservative_quantile(x, -0.1), acc1.quantile(-0.1))
 
 class TestSimpleGaussian(unittest.TestCase):
     def assertDifferenceCompatFC(self, a, b):
@@ -50,6 +244,144 @@ class TestSimpleGaussian(unittest.TestCase):
         ul = simple_gaussian.upper_limit(*p)
         self.assertTupleEqual((ll, ul), simple_gaussian.confidence_interval(*p))
 
+    def test_confidence_interval_fast(self):
+        """Test the central-interval fast path against the full calculation."""
+        for cl in (0.6827, 0.9, 0.99):
+            z = simple_gaussian.special.ndtri(0.5 * (1.0 + cl))
+            for x in (-1.0, 0.0, 0.4, 2 * z - 0.01, 2 * z, 4.0, 9.0):
+                fast = simple_gaussian.confidence_interval(x, 1.3, cl)
+                full = simple_gaussian.confidence_interval(x, 1.3, cl, fast=False)
+                self.assertAlmostEqual(full[0], fast[0], 8)
+                self.assertAlmostEqual(full[1], fast[1], 8)
+            self.assertTrue(simple_gaussian.is_central(2 * z * 1.3, 1.3, cl))
+            self.assertFalse(simple_gaussian.is_central(2 * z * 1.3 - 0.01, 1.3, cl))
+            self.assertEqual((6.0 - z, 6.0 + z), simple_gaussian.confidence_interval(6.0, 1.0, cl))
+
+    def test_confidence_interval_levels(self):
+        """Test that confidence_interval with several levels agrees with scalar calls."""
+        cls = np.array([0.6827, 0.9, 0.95, 0.99])
+        for x in (-2.3, 0.0, 0.5, 2.4, 4.5):
+            for fast in (True, False):
+                ll, ul = simple_gaussian.confidence_interval(x, 1.5, cls, fast)
+                self.assertEqual(cls.shape, ll.shape)
+                for i, cl in enumerate(cls):
+                    ref = simple_gaussian.confidence_interval(x, 1.5, cl, fast)
+                    self.assertAlmostEqual(ref[0], ll[i], 10)
+                    self.assertAlmostEqual(ref[1], ul[i], 10)
+
+    def test_critical_value_vectorized(self):
+        """Test that array-valued critical_value agrees with scalar calls."""
+        mus = np.array([-0.5, 0.0, 0.3, 1.0, 4.0])
+        alphas = np.array([[0.1], [0.01]])
+        cv = simple_gaussian.critical_value(mus, 1.5, alphas)
+        self.assertEqual((2, 5), cv.shape)
+        for i, alpha in enumerate(alphas[:, 0]):
+            for j, mu in enumerate(mus):
+                self.assertAlmostEqual(simple_gaussian.critical_value(mu, 1.5, alpha), cv[i, j], 10)
+        # Far from the boundary the critical value is the chi2(1) quantile.
+        self.assertAlmostEqual(2.705543454, simple_gaussian.critical_value(10.0, 1.0, 0.1), 8)
+
+    def test_critical_value_exact(self):
+        """Test that the exact critical values solve CDF(c) = 1 - alpha."""
+        mus = np.array([1e-6, 0.1, 0.7, 1.5, 2.5])
+        for alpha in (0.3173, 0.05):
+            cv = simple_gaussian.critical_value(mus, 1.2, alpha, exact=True)
+            np.testing.assert_allclose(
+                    simple_gaussian.neg_2_log_likelihood_ratio_CDF(cv, mus, 1.2),
+                    1.0 - alpha, rtol=0, atol=1e-13)
+
+        # The PDF is the derivative of the CDF.
+        l = np.linspace(0.05, 8.0, 50)
+        for mu in (-0.5, 0.3, 1.2, 3.0):
+            h = 1e-6
+            dcdf = (simple_gaussian.neg_2_log_likelihood_ratio_CDF(l + h, mu, 1.3)
+                    - simple_gaussian.neg_2_log_likelihood_ratio_CDF(l - h, mu, 1.3)) / (2*h)
+            np.testing.assert_allclose(simple_gaussian.neg_2_log_likelihood_ratio_PDF(l, mu, 1.3),
+                                       dcdf, rtol=0, atol=1e-8)
+
+    def test_critical_value_interpolant(self):
+        """Test the interpolated critical values against the exact ones."""
+        interp = simple_gaussian.critical_value_interpolant(0.1)
+        self.assertIs(interp, simple_gaussian.critical_value_interpolant(0.1))
+        self.assertLess(interp.max_error, interp.tol)
+
+        mus = np.linspace(-1.0, 5.0, 1201)
+        np.testing.assert_allclose(simple_gaussian.critical_value(mus, 2.0, 0.1),
+                                   simple_gaussian.critical_value(mus, 2.0, 0.1, exact=True),
+                                   rtol=0, atol=interp.tol)
+
+        # tolerances below the accuracy of the exact values stop after `maxiter`
+        interp = simple_gaussian.CriticalValueInterpolant(0.1, tol=1e-13, maxiter=3)
+        self.assertGreater(interp.max_error, interp.tol)
+
+    def test_gaussian_belt(self):
+        """Test GaussianBelt against confidence_interval within its tolerance."""
+        belt = simple_gaussian.GaussianBelt(0.9)
+        xs = np.array([-12.0, -2.3, -0.5, 0.0, 0.5, 1.3, 1.7, 2.4, 3.0, 4.5])
+        for sigma in (1.0, 2.0):
+            ll, ul = belt.confidence_interval(xs * sigma, sigma)
+            for i, x in enumerate(xs * sigma):
+                ref = simple_gaussian.confidence_interval(x, sigma, 0.9)
+                self.assertLess(abs(ref[0] - ll[i]), belt.tol * sigma)
+                self.assertLess(abs(ref[1] - ul[i]), belt.tol * sigma)
+        self.assertDifferenceCompatFC(2.14, belt.upper_limit(0.5))
+
+    def test_gaussian_belt_low_cl(self):
+        """Test GaussianBelt for cl < 0.5, where the critical value at mu=0 is 0."""
+        xs = np.array([-2.0, -0.5, 0.0, 0.5, 3.0])
+        ll, ul = simple_gaussian.confidence_interval_batch(xs, 1.0, 0.3)
+        for i, x in enumerate(xs):
+            ref = simple_gaussian.confidence_interval(x, 1.0, 0.3)
+            self.assertLess(abs(ref[0] - ll[i]), 1e-8)
+            if x >= 0.0:
+                self.assertLess(abs(ref[1] - ul[i]), 1e-8)
+        # for x < 0 the upper limit is the inverse of the acceptance intervals
+        self.assertEqual(ul[0], 0.0)
+        x1, x2 = simple_gaussian.acceptance_interval(ul[1], 1.0, 0.3, exact=True)
+        self.assertAlmostEqual(x1, -0.5, delta=1e-6)
+
+    def test_confidence_interval_batch(self):
+        """Test that confidence_interval_batch agrees with confidence_interval."""
+        xs = np.array([[-2.3, 0.5], [1.3, 4.0]])
+        sigmas = np.array([1.0, 0.5])
+        ll, ul = simple_gaussian.confidence_interval_batch(xs, sigmas, 0.95)
+        self.assertEqual(xs.shape, ll.shape)
+        for i, j in np.ndindex(*xs.shape):
+            ref = simple_gaussian.confidence_interval(xs[i, j], sigmas[j], 0.95)
+            self.assertAlmostEqual(ref[0], ll[i, j], 7)
+            self.assertAlmostEqual(ref[1], ul[i, j], 7)
+
+    def test_coverage(self):
+        """Test the analytic coverage and the acceptance intervals."""
+        mus = np.linspace(0.0, 6.0, 61)
+        for cl in (0.6827, 0.9, 0.99):
+            np.testing.assert_allclose(simple_gaussian.coverage(mus, 1.5, cl), cl, rtol=0, atol=1e-8)
+            np.testing.assert_allclose(simple_gaussian.coverage(mus, 1.5, cl, exact=True), cl, rtol=0, atol=1e-12)
+
+        # The limits of the acceptance interval edges are `mu`.
+        x1, x2 = simple_gaussian.acceptance_interval(1.0, 1.5, 0.9)
+        self.assertAlmostEqual(1.0, simple_gaussian.upper_limit(x1, 1.5, 0.9), 8)
+        self.assertAlmostEqual(1.0, simple_gaussian.lower_limit(x2, 1.5, 0.9), 8)
+        self.assertEqual(-np.inf, simple_gaussian.acceptance_interval(0.0, 1.0, 0.9)[0])
+
+        # For `cl < 0.5` the acceptance interval of `mu == 0` is `x <= 0`.
+        with np.errstate(divide='raise', invalid='raise'):
+            self.assertEqual((-np.inf, 0.0), simple_gaussian.acceptance_interval(0.0, 1.0, 0.3))
+            self.assertEqual(0.5, simple_gaussian.coverage(0.0, 1.0, 0.3))
+
+    def test_expected_upper_limit(self):
+        """Test the expected upper limits against the limits of the x quantiles."""
+        mus = np.array([0.0, 0.5, 2.0])
+        cls = np.array([[0.9], [0.95]])
+        eul = simple_gaussian.expected_upper_limit(mus, 1.5, cls)
+        self.assertEqual((2, 3, 5), eul.shape)
+        nsig = np.arange(-2.0, 3.0)
+        for i, cl in enumerate(cls[:, 0]):
+            for j, mu in enumerate(mus):
+                for k, n in enumerate(nsig):
+                    ref = simple_gaussian.upper_limit(mu + n * 1.5, 1.5, cl)
+                    self.assertAlmostEqual(ref, eul[i, j, k], 7)
+
     def test_lower_limit_against_FC_paper(self):
         """Test lower_limit against Table X of Feldman+Cousins paper."""
         self.assertDifferenceCompatFC(0.0, simple_gaussian.lower_limit(-2.3, 1.0, 0.6827))
@@ -158,6 +490,187 @@ class TestSimplePoissonian(TestSimpleGaussian):
         ul = simple_poisson.upper_limit(*p)
         self.assertTupleEqual((ll, ul), simple_poisson.confidence_interval(*p))
 
+    def test_critical_value_cache(self):
+        """Test that repeated intervals re-use the cached critical values."""
+        simple_poisson.confidence_interval(4, 2.5, 0.9)
+        misses = simple_poisson._critical_state.cache_info().misses
+        simple_poisson.confidence_interval(4, 2.5, 0.9)
+        self.assertEqual(misses, simple_poisson._critical_state.cache_info().misses)
+
+        # The cache doesn't change the signature.
+        self.assertEqual(simple_poisson.critical_value(3.0, 1.0, 0.1),
+                         simple_poisson.critical_value(3.0, 1.0, alpha=0.1))
+        self.assertEqual(simple_poisson.critical_value(3.0, 1.0, 0.1),
+                         simple_poisson.critical_value(b=3.0, t=1.0, alpha=0.1))
+
+    def test_critical_value_sorted(self):
+        """Test critical_value against the former sorted construction."""
+        def sorted_critical_value(b, t, alpha):
+            mu = b + t
+            p_thresh = min(alpha, simple_poisson.poisson_pmf(0, mu))
+            n_max = simple_poisson.poisson_minor_isf(p_thresh, mu)
+            n_p_lr = [(n_max, simple_poisson.poisson_sf(n_max, mu),
+                       simple_poisson.likelihood_ratio(n_max+1, b, t))]
+            n_p_lr.extend((n, simple_poisson.poisson_pmf(n, mu), simple_poisson.likelihood_ratio(n, b, t))
+                          for n in range(n_max+1))
+            n_p_lr.sort(key=lambda x: x[2])
+            p_cum = 0.0
+            for i, (n, p, lr) in enumerate(n_p_lr):
+                p_cum += p
+                if p_cum >= alpha:
+                    return n_p_lr[max(i-1, 0)][2]
+
+        # `t = 0` has equal likelihood ratios 1 for all `n <= b`
+        for b in (0.5, 3.0, 7.5):
+            for t in np.r_[0.0, np.linspace(0.05, 15.0, 25)]:
+                for alpha in (0.3173, 0.1, 0.01):
+                    self.assertEqual(sorted_critical_value(b, t, alpha),
+                                     simple_poisson.critical_value(b, t, alpha))
+
+    def test_critical_value_large_background(self):
+        """Test that the critical value defines the rejection region for large backgrounds."""
+        for b, t, alpha in ((45.0, 3.0, 0.1), (400.0, 25.0, 0.05), (1000.0, 0.0, 0.01)):
+            mu = b + t
+            ns = np.arange(int(mu + 20 * np.sqrt(mu)))
+            crit = simple_poisson.critical_value(b, t, alpha)
+            lr = simple_poisson.likelihood_ratio(ns, b, t)
+            p = simple_poisson.poisson_pmf(ns, mu)
+            # `crit` is the largest rejected likelihood ratio.
+            self.assertLess(p[lr <= crit].sum(), alpha)
+            self.assertGreaterEqual(p[lr <= lr[lr > crit].min()].sum(), alpha)
+
+    def test_critical_value_curve(self):
+        """Test that critical_value_curve agrees with scalar calls."""
+        for b, alpha in ((0.5, 0.1), (3.0, 0.05), (150.0, 0.3173)):
+            ts = np.linspace(0.0, 20.0, 201).reshape(3, 67)
+            curve = simple_poisson.critical_value_curve(b, ts, alpha, chunk_size=2000)
+            self.assertEqual(curve.shape, ts.shape)
+            for idx in np.ndindex(*ts.shape):
+                self.assertEqual(simple_poisson.critical_value(b, ts[idx], alpha), curve[idx])
+
+    def test_poisson_belt(self):
+        """Test PoissonBelt against confidence_interval and the F+C tables."""
+        belt = simple_poisson.PoissonBelt(3.0, 0.9, n_max=10)
+        ns = np.arange(2, 13)
+        ll, ul = belt.confidence_interval(ns)
+        for i, n in enumerate(ns):
+            ref = simple_poisson.confidence_interval(n, 3.0, 0.9)
+            self.assertLess(abs(ref[0] - ll[i]), 0.011)
+            self.assertLess(abs(ref[1] - ul[i]), 0.011)
+
+        # `n > n_max` is calculated, for scalars and arrays
+        belt = simple_poisson.PoissonBelt(3.0, 0.9, n_max=5)
+        self.assertEqual(simple_poisson.upper_limit(7, 3.0, 0.9), belt.upper_limit(7))
+        self.assertEqual(simple_poisson.lower_limit(7, 3.0, 0.9), belt.lower_limit(np.array([4, 7]))[1])
+        self.assertEqual(belt.upper_limit(4), belt.upper_limit(np.array([4, 7]))[0])
+
+        # The belt does not accept `n` on plateaus with `delta(t) == 0`, so
+        # it reproduces the tabulated values where the bisection does not.
+        for b, ul in ((1.0, 5.78), (3.0, 3.78), (5.0, 1.90), (8.0, 0.60)):
+            belt = simple_poisson.PoissonBelt(b, 0.6827, n_max=4)
+            self.assertUpperLimitCompatFC(ul, belt.upper_limit(4))
+
+    def test_confidence_interval_batch(self):
+        """Test the batch intervals against the scalar function."""
+        n = np.array([[0, 3, 6], [6, 10, 3]])
+        b = np.array([[3.0], [0.5]])
+        ll, ul = simple_poisson.confidence_interval_batch(n, b, 0.9)
+        self.assertEqual(ll.shape, (2, 3))
+        for i, j in np.ndindex(*n.shape):
+            self.assertEqual(simple_poisson.confidence_interval(n[i, j], b[i, 0], 0.9),
+                             (ll[i, j], ul[i, j]))
+
+    def test_confidence_interval_scan(self):
+        """Test the scan over `b` against the scalar function."""
+        bs = np.linspace(1.0, 6.0, 26)
+        ll, ul, jumps = simple_poisson.confidence_interval_scan(5, bs, 0.9)
+        for i, b in enumerate(bs):
+            self.assertEqual(simple_poisson.confidence_interval(5, b, 0.9), (ll[i], ul[i]))
+        # the lower limit drops to zero, the upper limit jumps up and down
+        self.assertEqual([j.limit for j in jumps], [0, 1, 1])
+        for j in jumps:
+            self.assertLessEqual(j.b_hi - j.b_lo, 1e-3)
+            self.assertEqual(simple_poisson.confidence_interval(5, j.b_lo, 0.9)[j.limit], j.lo)
+            self.assertEqual(simple_poisson.confidence_interval(5, j.b_hi, 0.9)[j.limit], j.hi)
+        self.assertRaises(ValueError, simple_poisson.confidence_interval_scan, 5, bs[::-1], 0.9)
+
+    def test_asymptotic(self):
+        """Test the asymptotic limits against the exact ones."""
+        for n, b, clvl in ((230, 200.0, 0.9), (1100, 1000.0, 0.6827), (1000, 1000.0, 0.95)):
+            exact, approx = simple_poisson.validate_asymptotic(n, b, clvl)
+            np.testing.assert_allclose(exact, approx, atol=simple_poisson.ASYMPTOTIC_TOLERANCE)
+        # the regime switch is opt-in
+        self.assertEqual(simple_poisson.confidence_interval(1200, 1000.0, 0.9, asymptotic=True),
+                         simple_poisson.asymptotic_confidence_interval(1200, 1000.0, 0.9))
+        self.assertNotEqual(simple_poisson.confidence_interval(1200, 1000.0, 0.9, asymptotic=True),
+                            simple_poisson.confidence_interval(1200, 1000.0, 0.9))
+        self.assertEqual(simple_poisson.confidence_interval(1200, 1000.0, 0.9, asymptotic=(1300, 1000.0)),
+                         simple_poisson.confidence_interval(1200, 1000.0, 0.9))
+        # the limits are continuous across the thresholds, i.e. the step
+        # from `n_min - 1` to `n_min` is the exact one within the tolerance
+        n0, b0 = simple_poisson.ASYMPTOTIC_THRESHOLDS
+        for clvl in (0.6827, 0.9):
+            step = np.subtract(simple_poisson.confidence_interval(n0, b0, clvl, asymptotic=True),
+                               simple_poisson.confidence_interval(n0 - 1, b0, clvl, asymptotic=True))
+            exact_step = np.subtract(simple_poisson.confidence_interval(n0, b0, clvl),
+                                     simple_poisson.confidence_interval(n0 - 1, b0, clvl))
+            np.testing.assert_allclose(step, exact_step, rtol=0, atol=simple_poisson.ASYMPTOTIC_TOLERANCE)
+        # no overflow for large `n`
+        self.assertTrue(np.isfinite(simple_poisson.likelihood_ratio(5000, 1.0, 4000.0)))
+
+    def test_limit_table(self):
+        """Test LimitTable lookups against confidence_interval."""
+        exact = partial(simple_poisson.confidence_interval, solver=simple_poisson.breakpoint_solver)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, "limits.npy")
+            poisson_table.build_table(path, 6, np.linspace(2.0, 4.0, 5), [0.9],
+                                      tol=0.05, max_refine=3, processes=1)
+            table = poisson_table.LimitTable(path)
+            self.assertTrue(table._valid.any())
+            # the error is bounded in the whole intervals, not only at the check points
+            for b in np.linspace(2.0, 4.0, 101):
+                for n in range(7):
+                    np.testing.assert_allclose(table.confidence_interval(n, b, 0.9),
+                                               exact(n, b, 0.9), rtol=0, atol=0.05)
+            # the worker processes give the same table
+            path2 = os.path.join(tmpdir, "limits2.npy")
+            poisson_table.build_table(path2, 6, np.linspace(2.0, 4.0, 5), [0.9],
+                                      tol=0.05, max_refine=3, processes=2)
+            np.testing.assert_array_equal(np.load(path), np.load(path2))
+            # outside of the table
+            for n, b, clvl in ((8, 3.0, 0.9), (2, 5.0, 0.9), (2, 3.0, 0.6827)):
+                self.assertEqual(exact(n, b, clvl), table.confidence_interval(n, b, clvl))
+
+            self.assertRaises(ValueError, poisson_table.build_table, path, 6, [0.0, 1.0], [0.9])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_breakpoint_solver(self):
+        """Test that the breakpoint solver agrees with fine bisection."""
+        fine = partial(tools.bisect, xtol=1e-11, ftol=0.0)
+        for p in ((1, 1.5, 0.9), (6, 3.0, 0.9), (12, 0.5, 0.95), (0, 0.5, 0.95), (4, 0.5, 0.9)):
+            np.testing.assert_allclose(simple_poisson.confidence_interval(*p, solver=simple_poisson.breakpoint_solver),
+                                       simple_poisson.confidence_interval(*p, solver=fine), atol=1e-9)
+
+        # the warm start of the batch overrides `delta` where its sign is known
+        ns = np.arange(10)
+        ll, ul = simple_poisson.confidence_interval_batch(ns, 3.0, 0.9, solver=simple_poisson.breakpoint_solver)
+        for i, n in enumerate(ns):
+            self.assertEqual(simple_poisson.confidence_interval(n, 3.0, 0.9, solver=simple_poisson.breakpoint_solver),
+                             (ll[i], ul[i]))
+
+        # `args` are passed to `f`
+        def delta(t, n, b, alpha):
+            return simple_poisson.likelihood_ratio(n, b, t) - simple_poisson.critical_value(b, t, alpha)
+        delta.n, delta.b, delta.alpha = 6, 3.0, 0.1
+        self.assertEqual(simple_poisson.breakpoint_solver(simple_poisson.mk_delta_func(6, 3.0, 0.9), 5.0, 20.0),
+                         simple_poisson.breakpoint_solver(delta, 5.0, 20.0, args=(6, 3.0, 0.1)))
+
+        # other functions are bisected
+        self.assertEqual(tools.bisect(lambda t: 3.3 - t, 0.0, 10.0),
+                         simple_poisson.breakpoint_solver(lambda t: 3.3 - t, 0.0, 10.0))
+
     # Note:
     # - The parameters deactivated by "#MISS(calculated_value)" differ
     #   compared to the F+C tables. The calculated intervals are larger
@@ -167,6 +680,40 @@ class TestSimplePoissonian(TestSimpleGaussian):
     #   but usually only by 0.01. I assume it's some numerics in this or
     #   their code.
 
+    def test_confidence_interval_executor(self):
+        pool = ThreadPool(2)
+        try:
+            for n, b, clvl in ((1, 1.5, .9), (6, 3., .9)):
+                np.testing.assert_allclose(
+                        simple_poisson.confidence_interval(n, b, clvl, executor=pool),
+                        simple_poisson.confidence_interval(n, b, clvl),
+                        atol=0.02)
+        finally:
+            pool.close()
+
+        pool = Pool(2)
+        try:
+            for n, b, clvl in ((1, 1.5, .9), (6, 3., .9)):
+                np.testing.assert_allclose(
+                        simple_poisson.confidence_interval(n, b, clvl, executor=pool),
+                        simple_poisson.confidence_interval(n, b, clvl),
+                        atol=0.02)
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_hybrid_delta_pickle(self):
+        """Test that the hybrid `delta` function can be sent to process pools."""
+        delta = hybrid_poisson.mk_delta_func(5, 6, 2.0, 0.9)
+        np.random.seed(1)
+        d = delta(2.0, 1000)
+        self.assertEqual(1, delta.cache_info().currsize)
+
+        copy = pickle.loads(pickle.dumps(delta))
+        self.assertEqual(0, copy.cache_info().currsize)
+        np.random.seed(1)
+        self.assertEqual(d, copy(2.0, 1000))
+
     def test_lower_limit_against_FC_paper_CL06827(self):
         CL = 0.6827
 
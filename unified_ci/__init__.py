@@ -13,6 +13,9 @@ For each  a single module exists.
   Expectation value of Poissonian with *known* background.
 :mod:`~unified_ci.hybrid_poisson`
   Expectation value of Poissonian with *unknown* background.
+:mod:`~unified_ci.poisson_table`
+  Precomputed, memory-mapped limit tables for
+  :mod:`~unified_ci.simple_poisson`.
 
 The modules offer a more-or-less uniform interface to calculate the lower
 and upper bounds of uniform confidence intervals as well as to calculate the
@@ -17,8 +17,10 @@ Functions of Interest
 # Use float division
 from __future__ import print_function, division, absolute_import
 import numpy as np
+from functools import partial
+from scipy import special
 
-from .tools import conservative_quantile, bisect
+from .tools import conservative_quantile, bisect, ksection, upper_bracket, memoize, QuantileAccumulator
 
 
 def global_fit_b(n, m, gamma):
@@ -111,7 +113,7 @@ def likelihood_ratio(n, m, theta, gamma):
     return (bhh/bh)**m * ((theta+bhh)/(th+bh))**n * np.exp(n + m - (1+gamma)*bhh - theta)
 
 
-def critical_value(n, m, theta, gamma, clvl, N_mc):
+def critical_value(n, m, theta, gamma, clvl, N_mc, chunk_size=1000000):
     """Calculate the critical likelihood ratio value using hybrid resampling.
 
     Parameters
@@ -129,6 +131,11 @@ def critical_value(n, m, theta, gamma, clvl, N_mc):
     N_mc : int
         The number of MC toy experiments used to estimate the critical
         likelihood ratio.
+    chunk_size : int, optional
+        If `N_mc` exceeds `chunk_size`, the toy experiments are generated in
+        chunks of this size and accumulated in a
+        :class:`~unified_ci.tools.QuantileAccumulator` to bound the memory
+        usage.
 
     Returns
     -------
@@ -137,27 +144,70 @@ def critical_value(n, m, theta, gamma, clvl, N_mc):
     """
     bhh = local_fit_b(n, m, theta, gamma)
 
-    ns = np.random.poisson(theta + bhh, size=N_mc)
-    ms = np.random.poisson(gamma*bhh, size=N_mc)
-    l = likelihood_ratio(ns, ms, theta, gamma)
-    return conservative_quantile(l, -(1.0 - clvl))[0]
+    if N_mc <= chunk_size:
+        return conservative_quantile(_sample_likelihood_ratio(m, theta, gamma, bhh, N_mc),
+                                     -(1.0 - clvl))
 
+    acc = QuantileAccumulator()
+    for start in range(0, N_mc, chunk_size):
+        size = min(chunk_size, N_mc - start)
+        acc.add(_sample_likelihood_ratio(m, theta, gamma, bhh, size))
+    return acc.quantile(-(1.0 - clvl))
 
-def mk_delta_func(n, m, gamma, clvl):
-    cache = {}
-    def delta(theta, n_mc):
-        k = (theta, n_mc)
-        if k not in cache:
-            ret =  likelihood_ratio(n, m, theta, gamma) - critical_value(n, m, theta, gamma, clvl, n_mc)
-            cache[k] = ret
-        else:
-            ret = cache[k]
-        return ret
-    delta.cache = cache
-    return delta
 
+def _sample_likelihood_ratio(m, theta, gamma, bhh, size):
+    """Sample likelihood ratios of `size` hybrid toy experiments."""
+    ns = np.random.poisson(theta + bhh, size=size)
+    ms = np.random.poisson(gamma*bhh, size=size)
+    return likelihood_ratio(ns, ms, theta, gamma)
 
-def lower_limit(n, m, gamma, clvl, N_mc, delta=None):
+
+class _DeltaFunc(object):
+    """The 'likelihood ratio minus critical value' function `delta(theta, n_mc)`.
+
+    A module level class instead of a closure, so that `delta` can be
+    pickled for process pools (see :func:`~unified_ci.tools.ksection`). The
+    critical values are MC estimates, so the cache is kept per delta
+    function instead of sharing it between intervals. It's not pickled,
+    i.e. every process has its own cache.
+    """
+    def __init__(self, n, m, gamma, clvl, maxsize=1024):
+        self.n = n
+        self.m = m
+        self.gamma = gamma
+        self.clvl = clvl
+        self.maxsize = maxsize
+        self._init_cache()
+
+    def _init_cache(self):
+        self._cached = memoize(maxsize=self.maxsize)(self._delta)
+        self.cache_info = self._cached.cache_info
+        self.cache_clear = self._cached.cache_clear
+
+    def _delta(self, theta, n_mc):
+        return (likelihood_ratio(self.n, self.m, theta, self.gamma)
+                - critical_value(self.n, self.m, theta, self.gamma, self.clvl, n_mc))
+
+    def __call__(self, theta, n_mc):
+        return self._cached(theta, n_mc)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ('_cached', 'cache_info', 'cache_clear'):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
+
+
+def mk_delta_func(n, m, gamma, clvl, maxsize=1024):
+    """Prepare 'likelihood ratio minus critical value' function."""
+    return _DeltaFunc(n, m, gamma, clvl, maxsize)
+
+
+def lower_limit(n, m, gamma, clvl, N_mc, delta=None, solver=bisect, executor=None):
     """Calculate the lower limit of the confidence interval.
 
     Parameters
@@ -168,11 +218,22 @@ def lower_limit(n, m, gamma, clvl, N_mc, delta=None):
     clvl : float
     N_mc : int
     delta : callable, optional
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or a function
+        with the same interface.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements. Use a
+        process pool, the MC sampling in threads is serialized by the
+        shared random state.
     """
     theta_best = global_fit_theta(n, m, gamma)
 
     if delta is None:
         delta = mk_delta_func(n, m, gamma, clvl)
+    if executor is not None:
+        solver = partial(ksection, executor=executor)
 
     if theta_best == 0.0 or delta(0.0, N_mc) >= 0.0:
         return 0.0
@@ -183,9 +244,9 @@ def lower_limit(n, m, gamma, clvl, N_mc, delta=None):
         # t0 = optimize.brentq(f, 0, t_best)
         # t0 = optimize.bisect(f, 0, t_best, xtol=1e-4)
         # So we have to use a hand-crafted root-finding.
-        return bisect(delta, theta_best, 0, args=(N_mc,))
+        return solver(delta, theta_best, 0, args=(N_mc,))
 
-def upper_limit(n, m, gamma, clvl, N_mc, delta=None):
+def upper_limit(n, m, gamma, clvl, N_mc, delta=None, solver=bisect, executor=None):
     """Calculate the upper limit of the confidence interval.
 
     Parameters
@@ -196,23 +257,35 @@ def upper_limit(n, m, gamma, clvl, N_mc, delta=None):
     clvl : float
     N_mc : int
     delta : callable, optional
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or a function
+        with the same interface.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements. Use a
+        process pool, the MC sampling in threads is serialized by the
+        shared random state.
     """
     theta_best = global_fit_theta(n, m, gamma)
 
     if delta is None:
         delta = mk_delta_func(n, m, gamma, clvl)
+    if executor is not None:
+        solver = partial(ksection, executor=executor)
 
-    u = theta_best
-    v = max(1, 2*u)
-    while delta(v, N_mc) > 0:
-        u = v
-        v = 2*u
+    # Start from the asymptotic (score interval) estimate of the upper limit,
+    # with the uncertainty of the background estimate added to the step.
+    z = special.ndtri(0.5 * (1.0 + clvl))
+    guess = max(theta_best, n + 0.5*z**2 + z*np.sqrt(n + 0.25*z**2) - m/gamma)
+    u, v = upper_bracket(delta, theta_best, max(1, 2*theta_best), guess,
+                         0.25*np.sqrt(n + 1.0 + m/gamma**2), strict=True, args=(N_mc,))
 
-    return bisect(delta, u, v, args=(N_mc,))
+    return solver(delta, u, v, args=(N_mc,))
 
 
 
-def confidence_interval(n, m, gamma, clvl, N_mc):
+def confidence_interval(n, m, gamma, clvl, N_mc, solver=bisect, executor=None):
     """Calculate unified confidence interval for Poissonian signal with unknown background.
 
     Parameters
@@ -228,6 +301,15 @@ def confidence_interval(n, m, gamma, clvl, N_mc):
     N_mc : int
         The number of MC toy experiments used to estimate the critical
         likelihood ratio.
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or a function
+        with the same interface.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements. Use a
+        process pool, the MC sampling in threads is serialized by the
+        shared random state.
 
     Returns
     -------
@@ -235,8 +317,8 @@ def confidence_interval(n, m, gamma, clvl, N_mc):
         Lower and upper limits of the confidence interval.
     """
     delta = mk_delta_func(n, m, gamma, clvl)
-    t0 = lower_limit(n, m, gamma, clvl, N_mc, delta)
-    t1 = upper_limit(n, m, gamma, clvl, N_mc, delta)
+    t0 = lower_limit(n, m, gamma, clvl, N_mc, delta, solver, executor)
+    t1 = upper_limit(n, m, gamma, clvl, N_mc, delta, solver, executor)
     return t0, t1
 
 
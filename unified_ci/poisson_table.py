@@ -0,0 +1,274 @@
+"""\
+Precomputed limit tables for :mod:`~unified_ci.simple_poisson`
+--------------------------------------------------------------
+
+The limits of :func:`~unified_ci.simple_poisson.confidence_interval` with
+the :func:`~unified_ci.simple_poisson.breakpoint_solver` (i.e. the exact
+roots, which the default bisection approximates within its `xtol`) are
+precomputed on a grid of background rates `b` and confidence levels with
+:func:`build_table` and stored in a single `.npy` file. A
+:class:`LimitTable` memory-maps this file, so opening it costs no
+computation, and interpolates the limits linearly in `b`. The table is
+only interpolated in intervals of `b` where the interpolation error is
+bounded by the table tolerance (see :func:`build_table`); otherwise (and
+outside of the grid) the limits are calculated.
+
+The table can be built from the command line::
+
+    python -m unified_ci.poisson_table PATH N_MAX Bs CLs
+
+where `Bs` and `CLs` are comma separated lists or colon separated
+`start:stop:num` triples of `np.linspace` arguments.
+
+.. autofunction:: build_table
+
+.. autoclass:: LimitTable
+   :members:
+"""
+from __future__ import print_function, division, absolute_import
+import multiprocessing
+from itertools import product
+
+import numpy as np
+
+from .simple_poisson import confidence_interval, confidence_interval_batch, breakpoint_solver
+
+#: Version of the table file layout.
+FORMAT_VERSION = 2
+
+# Layout of the flat float64 array in the file:
+#   FORMAT_VERSION, tol, n_cl, n_b, n_max,
+#   clvls[n_cl], bs[n_b],
+#   limits[n_cl, n_b, n_max+1, 2],
+#   valid[n_cl, n_b-1, n_max+1]
+_HEADER_SIZE = 5
+
+
+def _limits(args):
+    """Calculate the limits for `n = 0..n_max`."""
+    b, clvl, n_max = args
+    ll, ul = confidence_interval_batch(np.arange(n_max + 1), b, clvl, solver=breakpoint_solver)
+    return np.array([ll, ul]).T
+
+
+def _compute(pool, bs, clvls, n_max):
+    """Calculate the limits with shape `(n_cl, n_b, n_max+1, 2)`."""
+    args = [(b, clvl, n_max) for clvl, b in product(clvls, bs)]
+    mapper = map if pool is None else pool.map
+    limits = np.array(list(mapper(_limits, args)))
+    return limits.reshape(len(clvls), len(bs), n_max + 1, 2)
+
+
+def _error_bound(l0, l_chk, l1, fractions):
+    """Bound the interpolation error between the check points.
+
+    `l0` and `l1` are the limits at the interval ends with shape
+    `(n_cl, n_int, n_max+1, 2)`, `l_chk` the limits at the check points
+    with shape `(n_cl, n_int, n_chk, n_max+1, 2)`. Between two adjacent
+    points, a monotonic limit and the interpolation are within the ranges
+    of their values at these points, which bounds their difference.
+    """
+    ls = np.concatenate((l0[:, :, np.newaxis], l_chk, l1[:, :, np.newaxis]), axis=2)
+    w = np.concatenate(([0.0], fractions, [1.0]))[:, np.newaxis, np.newaxis]
+    interp = l0[:, :, np.newaxis] + w * (l1 - l0)[:, :, np.newaxis]
+    l_lo = np.minimum(ls[:, :, :-1], ls[:, :, 1:])
+    l_hi = np.maximum(ls[:, :, :-1], ls[:, :, 1:])
+    i_lo = np.minimum(interp[:, :, :-1], interp[:, :, 1:])
+    i_hi = np.maximum(interp[:, :, :-1], interp[:, :, 1:])
+    err = np.maximum(l_hi - i_lo, i_hi - l_lo)
+    return err.max(axis=(2, 4))
+
+
+def build_table(path, n_max, bs, clvls, tol=1e-3, checks=3, max_refine=4, processes=None):
+    """Precompute the limits of :mod:`~unified_ci.simple_poisson` into a table file.
+
+    The limits are calculated with
+    :func:`~unified_ci.simple_poisson.confidence_interval_batch` and the
+    :func:`~unified_ci.simple_poisson.breakpoint_solver` in worker
+    processes. Every interval of the `b` grid is checked at `checks`
+    equidistant interior points. Assuming the limits are monotonic between
+    adjacent check points (jumps are allowed), the interpolation error in
+    the whole interval is bounded by the ranges of the limits and of the
+    interpolation between adjacent points. Intervals where this bound
+    exceeds `tol` are split at the middle check point up to `max_refine`
+    times. Intervals still failing the check afterwards are marked and not
+    interpolated by :class:`LimitTable`.
+
+    The bound includes the change of the limits between adjacent check
+    points, so the `b` grid is refined to a spacing of about
+    `(checks + 1) * tol / |dl/db|`, i.e. the cost grows with `1 / tol`.
+
+    Parameters
+    ----------
+    path : str
+        The output file name (should end with `.npy`).
+    n_max : int
+        The largest tabulated measurement.
+    bs : sequence of float
+        The initial grid of background rates, `b > 0`.
+    clvls : sequence of float
+        The confidence levels.
+    tol : float, optional
+        The bound of the interpolation error of the limits.
+    checks : int, optional
+        The number of check points per interval.
+    max_refine : int, optional
+        The maximum number of refinements of the `b` grid.
+    processes : int, optional
+        The number of worker processes, by default the number of CPUs. If
+        `1`, the limits are calculated in this process.
+    """
+    bs = np.unique(np.asarray(bs, dtype=float))
+    if bs[0] <= 0.0:
+        raise ValueError("background rates must be positive, got b={0!r}".format(bs[0]))
+    clvls = np.asarray(clvls, dtype=float)
+    fractions = np.arange(1, checks + 1) / (checks + 1.0)
+    mid = checks // 2
+    pool = None if processes == 1 else multiprocessing.Pool(processes)
+    try:
+        limits = _compute(pool, bs, clvls, n_max)
+        # `checked` marks final intervals, `valid` the verified (cl, n) therein
+        checked = np.zeros(bs.size - 1, dtype=bool)
+        valid = np.zeros((clvls.size, bs.size - 1, n_max + 1), dtype=bool)
+        for level in range(max_refine + 1):
+            todo = np.flatnonzero(~checked)
+            if not todo.size:
+                break
+            b_chk = bs[todo, np.newaxis] + (bs[todo + 1] - bs[todo])[:, np.newaxis] * fractions
+            l_chk = _compute(pool, b_chk.ravel(), clvls, n_max)
+            l_chk = l_chk.reshape(clvls.size, todo.size, checks, n_max + 1, 2)
+            ok = _error_bound(limits[:, todo], l_chk, limits[:, todo + 1], fractions) <= tol
+
+            good = ok.all(axis=(0, 2))
+            split = ~good if level < max_refine else np.zeros_like(good)
+            # intervals which are not split are final
+            final = todo[~split]
+            checked[final] = True
+            valid[:, final] = ok[:, ~split]
+
+            # insert the middle check points of the split intervals
+            pos = todo[split] + 1
+            bs = np.insert(bs, pos, b_chk[split, mid])
+            limits = np.insert(limits, pos, l_chk[:, split, mid], axis=1)
+            # both halves of a split interval are unchecked
+            checked = np.insert(checked, pos, False)
+            valid = np.insert(valid, pos, False, axis=1)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    header = [FORMAT_VERSION, tol, clvls.size, bs.size, n_max]
+    np.save(path, np.concatenate((header, clvls, bs, limits.ravel(), valid.ravel())))
+
+
+class LimitTable(object):
+    """Memory-mapped table of :mod:`~unified_ci.simple_poisson` limits.
+
+    The table file is created with :func:`build_table`. Limits are
+    interpolated linearly in `b` where the interpolation error is bounded
+    by `tol`. For `n`, `b` or confidence levels not covered by the table,
+    the limits are calculated with
+    :func:`~unified_ci.simple_poisson.confidence_interval` and the
+    :func:`~unified_ci.simple_poisson.breakpoint_solver`.
+
+    Parameters
+    ----------
+    path : str
+        The table file.
+
+    Examples
+    --------
+    >>> build_table('limits.npy', 20, np.linspace(0.1, 15.0, 150), [0.9])  # doctest: +SKIP
+    >>> table = LimitTable('limits.npy')                                   # doctest: +SKIP
+    >>> ll, ul = table.confidence_interval(4, 3.05, 0.9)                   # doctest: +SKIP
+    """
+    def __init__(self, path):
+        self.path = path
+        data = np.load(path, mmap_mode='r')
+        if data[0] != FORMAT_VERSION:
+            raise ValueError("unsupported table format {0!r} in '{1}' (expected {2!r})".format(data[0], path, FORMAT_VERSION))
+        self.tol = float(data[1])
+        n_cl, n_b, n_max = (int(v) for v in data[2:_HEADER_SIZE])
+        self.n_max = n_max
+
+        i = _HEADER_SIZE
+        self.clvls = data[i:i + n_cl]
+        i += n_cl
+        self.bs = data[i:i + n_b]
+        i += n_b
+        size = n_cl * n_b * (n_max + 1) * 2
+        self._limits = data[i:i + size].reshape(n_cl, n_b, n_max + 1, 2)
+        i += size
+        self._valid = data[i:i + n_cl * (n_b - 1) * (n_max + 1)].reshape(n_cl, n_b - 1, n_max + 1)
+
+    def _exact(self, n, b, clvl):
+        return confidence_interval(n, b, clvl, solver=breakpoint_solver)
+
+    def confidence_interval(self, n, b, clvl):
+        """Look up the confidence interval.
+
+        Parameters
+        ----------
+        n : int
+            The measured value.
+        b : float
+            The background rate.
+        clvl : float
+            The confidence level.
+
+        Returns
+        -------
+        ll, ul : float
+            The lower and upper limits of the confidence interval.
+        """
+        k = np.flatnonzero(self.clvls == clvl)
+        if not k.size or not 0 <= n <= self.n_max or not self.bs[0] <= b <= self.bs[-1]:
+            return self._exact(n, b, clvl)
+        k = k[0]
+
+        i = min(np.searchsorted(self.bs, b, side='right') - 1, self.bs.size - 2)
+        if b == self.bs[i]:
+            ll, ul = self._limits[k, i, n]
+            return float(ll), float(ul)
+        if not self._valid[k, i, n]:
+            return self._exact(n, b, clvl)
+
+        w = (b - self.bs[i]) / (self.bs[i + 1] - self.bs[i])
+        ll, ul = (1.0 - w) * self._limits[k, i, n] + w * self._limits[k, i + 1, n]
+        return float(ll), float(ul)
+
+    def lower_limit(self, n, b, clvl):
+        """Look up the lower limit (see :meth:`confidence_interval`)."""
+        return self.confidence_interval(n, b, clvl)[0]
+
+    def upper_limit(self, n, b, clvl):
+        """Look up the upper limit (see :meth:`confidence_interval`)."""
+        return self.confidence_interval(n, b, clvl)[1]
+
+
+def _parse_grid(arg):
+    """Parse a comma separated list or a colon separated linspace triple."""
+    if ":" in arg:
+        a, b, c = arg.split(":")
+        return np.linspace(float(a), float(b), int(c))
+    return [float(v) for v in arg.split(",")]
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Precompute a simple_poisson limit table.")
+    parser.add_argument("path", help="output file (.npy)")
+    parser.add_argument("n_max", type=int, help="largest tabulated measurement")
+    parser.add_argument("bs", type=_parse_grid, help="background rates, e.g. 0.1:15.0:150")
+    parser.add_argument("clvls", type=_parse_grid, help="confidence levels, e.g. 0.6827,0.9")
+    parser.add_argument("--tol", type=float, default=1e-3, help="bound of the interpolation error")
+    parser.add_argument("--checks", type=int, default=3, help="number of check points per interval")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+    build_table(args.path, args.n_max, args.bs, args.clvls, tol=args.tol, checks=args.checks,
+                processes=args.processes)
+
+
+if __name__ == "__main__":
+    main()
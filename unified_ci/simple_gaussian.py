@@ -11,33 +11,52 @@ Functions of Interest
 ---------------------
 
 * :func:`confidence_interval`
+* :func:`confidence_interval_batch`
+* :func:`expected_upper_limit`
 * :func:`lower_limit`
 * :func:`upper_limit`
+* :func:`is_central`
+* :func:`critical_value`
+* :func:`acceptance_interval`
+* :func:`coverage`
+* :class:`CriticalValueInterpolant`
+* :class:`GaussianBelt`
 """
 
+import logging
+import numpy as np
 from scipy import stats
 from scipy.optimize import bisect
+from scipy.interpolate import CubicSpline
 
 from scipy import special
 
+from .tools import upper_bracket, illinois_batch
+
 
 def neg_2_log_likelihood_ratio_CDF(l, mu, sigma):
     """Calculate the CDF of -2log(likelihood ratio) CDF.
 
+    All arguments are broadcast against each other.
+
     Parameters
     ----------
-    l : float
+    l : float or ndarray
         The :math:`l = \lambda = -2ln(\Lambda)` value to calculate the CDF at.
-    mu : float
+    mu : float or ndarray
         The expectation value to test.
-    sigma : float
+    sigma : float or ndarray
         The standard deviation of the distribution.
 
     Returns
     -------
-    prob : float (between 0 and 1)
+    prob : float or ndarray (between 0 and 1)
         The probability :math:`CDF(l) = Prob(\lambda < l)`.
     """
+    l = np.asarray(l, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+
     # p_lz = stats.norm.cdf(0, loc=mu, scale=sigma)
     p_lz = special.ndtr(-mu/sigma)
     p_gz = 1 - p_lz
@@ -46,68 +65,248 @@ def neg_2_log_likelihood_ratio_CDF(l, mu, sigma):
     # chi2 = stats.chi2(1)
     # nu = chi2.cdf(l_crit)
     nu = special.chdtr(1, l_crit)
+    chi = special.chdtr(1, l)
 
-    if l < l_crit:
-        # p_plus = p_gz * 2 * chi2.cdf(l) / (1.0 + nu)
-        p_plus = p_gz * 2 * special.chdtr(1, l) / (1.0 + nu)
-    else:
-        # p_plus = p_gz * (chi2.cdf(l) + nu) / (1.0 + nu)
-        p_plus = p_gz * (special.chdtr(1, l) + nu) / (1.0 + nu)
+    # p_plus = p_gz * 2 * chi2.cdf(l) / (1.0 + nu)      if l < l_crit
+    # p_plus = p_gz * (chi2.cdf(l) + nu) / (1.0 + nu)   otherwise
+    p_plus = p_gz * np.where(l < l_crit, 2 * chi, chi + nu) / (1.0 + nu)
 
-    tau = 0.5 * sigma**2 / mu * (mu**2 / sigma**2 - l)
-    if tau < 0:
-        # p_minus = p_lz - stats.norm.cdf(tau, loc=mu, scale=sigma)
-        p_minus = p_lz - special.ndtr((tau-mu)/sigma)
-    else:
-        p_minus = 0
-    return p_plus + p_minus
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = 0.5 * sigma**2 / mu * (l_crit - l)
+    # p_minus = p_lz - stats.norm.cdf(tau, loc=mu, scale=sigma)
+    p_minus = np.where(tau < 0, p_lz - special.ndtr((tau-mu)/sigma), 0.0)
+
+    # For mu <= 0 all negative measurements give lambda = 0.
+    prob = np.where(mu > 0, p_plus + p_minus, p_lz + p_gz * chi)
+    return prob[()]
+
+def neg_2_log_likelihood_ratio_PDF(l, mu, sigma):
+    """Calculate the PDF of -2log(likelihood ratio), i.e. the derivative of
+    :func:`neg_2_log_likelihood_ratio_CDF`.
+
+    The point mass at `l = 0` for `mu <= 0` is not included.
+
+    Parameters
+    ----------
+    l : float or ndarray
+        The :math:`l = \lambda = -2ln(\Lambda)` value to calculate the PDF at.
+    mu : float or ndarray
+        The expectation value to test.
+    sigma : float or ndarray
+        The standard deviation of the distribution.
+
+    Returns
+    -------
+    dens : float or ndarray
+        The probability density of :math:`\lambda` at `l`.
+    """
+    l = np.asarray(l, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+
+    p_gz = special.ndtr(mu/sigma)
+    l_crit = mu**2 / sigma**2
+    nu = special.chdtr(1, l_crit)
+    with np.errstate(divide='ignore'):
+        chi_dens = np.exp(-0.5 * l) / np.sqrt(2 * np.pi * l)
+
+    d_plus = p_gz * np.where(l < l_crit, 2 * chi_dens, chi_dens) / (1.0 + nu)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = 0.5 * sigma**2 / mu * (l_crit - l)
+        d_minus = np.where(tau < 0, _norm_pdf((tau-mu)/sigma) * 0.5 * sigma / mu, 0.0)
+
+    dens = np.where(mu > 0, d_plus + d_minus, p_gz * chi_dens)
+    return dens[()]
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x**2) / np.sqrt(2 * np.pi)
 
-def critical_value(mu_test, sigma, alpha):
+def _critical_sqrt_newton(m, alpha, maxiter=50):
+    """Solve for the square root of the critical value with Newton's method.
+
+    For `0 < m < r` with :math:`r^2 = c_\infty` the :math:`\chi^2_1`
+    quantile the critical value is above :math:`m^2`, where the CDF in terms
+    of :math:`s = \sqrt{l}` simplifies to
+
+    .. math::
+        F(s) = \Phi(s) - \Phi(-(s^2 + m^2)/(2m))
+
+    with :math:`F(m) \leq 1 - \alpha \leq F(r)`. Newton steps leaving the
+    bracket :math:`[m, r]` are replaced by bisection steps.
+    """
+    target = 1.0 - alpha
+    lo = m.copy()
+    hi = np.sqrt(special.chdtri(1, alpha)) * np.ones_like(m)
+    s = 0.5 * (lo + hi)
+    active = np.ones(m.shape, dtype=bool)
+    for _ in range(maxiter):
+        ms = m[active]
+        ss = s[active]
+        u = 0.5 * (ss**2 + ms**2) / ms
+        g = special.ndtr(ss) - special.ndtr(-u) - target[active]
+        dg = _norm_pdf(ss) + ss / ms * _norm_pdf(u)
+
+        above = g > 0
+        lo[active] = np.where(above, lo[active], ss)
+        hi[active] = np.where(above, ss, hi[active])
+
+        s_new = ss - g / dg
+        outside = (s_new <= lo[active]) | (s_new >= hi[active])
+        s_new = np.where(outside, 0.5 * (lo[active] + hi[active]), s_new)
+
+        s[active] = s_new
+        done = np.abs(s_new - ss) <= 4 * np.finfo(float).eps * ss
+        active[np.flatnonzero(active)[done]] = False
+        if not active.any():
+            break
+    return s
+
+def critical_value(mu_test, sigma, alpha, exact=False):
     """Estimate the critical value for -2log(likelihood ratio) from bisecting CDF.
 
+    All arguments are broadcast against each other. The critical value
+    depends only on `mu_test/sigma` and `alpha`, so by default it is looked
+    up in a :class:`CriticalValueInterpolant` built on first use for each
+    `alpha`. With `exact=True` all critical values are solved for together
+    by a safeguarded Newton iteration using the analytic density
+    :func:`neg_2_log_likelihood_ratio_PDF`.
+
     Parameters
     ----------
-    mu_test : float
+    mu_test : float or ndarray
         The assumed expectation value of the distribution to test.
-    sigma : float
+    sigma : float or ndarray
         The standaard deviation of the distribution.
-    alpha : float (between 0 and 1)
+    alpha : float or ndarray (between 0 and 1)
         The significance level (i.e. 1-CL).
+    exact : bool, optional
+        Solve for the critical values instead of interpolating.
 
     Returns
     -------
-    sol : float
+    sol : float or ndarray
         The critical value for :math:`\lambda=-2\log(\Lambda)`.
 
     See also
     --------
     Rotes Buch V, p.57--59
     """
-    if mu_test > 0.0:
-        def target(l):
-            return 1 - alpha - neg_2_log_likelihood_ratio_CDF(l, mu_test, sigma)
-        a = 0.0
-        fa = target(a)
-        if fa < 0:
-            raise RuntimeError("1 - alpha - CDF_{-2ln(R)}(0) is negative!")
-        b = 10.0
-        while target(b) > 0:
-            b = 10*b
-        sol = bisect(target, 0.0, b)
-    else:
+    if not exact:
+        m, alpha = np.broadcast_arrays(np.asarray(mu_test, dtype=float) / sigma,
+                                       np.asarray(alpha, dtype=float))
+        if alpha.ndim == 0:
+            return critical_value_interpolant(alpha[()])(m)
+        sol = np.empty(m.shape)
+        for a in np.unique(alpha):
+            sel = alpha == a
+            sol[sel] = critical_value_interpolant(a)(m[sel])
+        return sol
+
+    mu_test, sigma, alpha = np.broadcast_arrays(np.asarray(mu_test, dtype=float),
+                                                np.asarray(sigma, dtype=float),
+                                                np.asarray(alpha, dtype=float))
+    m = mu_test / sigma
+    # For m**2 above the chi2 quantile the boundary cannot be reached.
+    c_inf = special.chdtri(1, alpha)
+    sol = np.where(m**2 >= c_inf, c_inf, 0.0)
+
+    pos = (m > 0.0) & (m**2 < c_inf)
+    if pos.any():
+        sol[pos] = _critical_sqrt_newton(m[pos], alpha[pos])**2
+
+    neg = m <= 0.0
+    if neg.any():
         # p_gz = 1 - stats.norm.cdf(0, loc=mu_test, scale=sigma)
-        p_gz = 1 - special.ndtr(-mu_test/sigma)
-        t = 1.0 - alpha / p_gz
-        if t > 0:
-            # sol = stats.chi2.ppf(1.0 - alpha / p_gz, 1)
-            sol = special.chdtri(1, alpha / p_gz)
-        else:
-            print 'encountered questionable value < 0.0'
-            sol = 0.0
+        p_gz = 1 - special.ndtr(-mu_test[neg]/sigma[neg])
+        q = alpha[neg] / p_gz
+        if np.any(q >= 1):
+            logging.warn('encountered questionable value < 0.0')
+        # sol = stats.chi2.ppf(1.0 - alpha / p_gz, 1)
+        sol[neg] = np.where(q < 1, special.chdtri(1, np.fmin(q, 1.0)), 0.0)
 
-    return sol
+    return sol[()]
+
+class CriticalValueInterpolant(object):
+    """Interpolant of the critical value in units of `sigma` for fixed `alpha`.
 
-def neg_2_log_likelihood_ratio(mu_test, x):
+    The critical value is a function of :math:`m = \mu/\sigma` only. For
+    :math:`m \leq 0` it is given in closed form and for :math:`m^2` above
+    the :math:`\chi^2_1` quantile :math:`c_\infty` it is :math:`c_\infty`
+    itself (the boundary is not reachable). In between a cubic spline is
+    built on a grid which is refined until the interpolation error at the
+    midpoints of all grid intervals is below `tol/2`.
+
+    Parameters
+    ----------
+    alpha : float
+        The significance level (i.e. 1-CL).
+    tol : float, optional
+        The targeted absolute accuracy of the critical value.
+    n_init : int, optional
+        The size of the initial grid.
+    maxiter : int, optional
+        The maximum number of grid refinements. If `tol` is not reached
+        afterwards (it cannot be below the accuracy of the exact critical
+        values, about `1e-12`), a warning is logged.
+
+    Attributes
+    ----------
+    m : ndarray
+        The grid in :math:`m = \mu/\sigma`.
+    c : ndarray
+        The exact critical values on the grid.
+    max_error : float
+        The largest interpolation error found at the midpoints of the grid.
+    """
+    def __init__(self, alpha, tol=1e-9, n_init=17, maxiter=20):
+        self.alpha = alpha
+        self.tol = tol
+        self.c_inf = special.chdtri(1, alpha)
+        self.m_max = np.sqrt(self.c_inf)
+
+        m = np.linspace(0.0, self.m_max, n_init)
+        c = critical_value(m, 1.0, alpha, exact=True)
+        for i in range(maxiter + 1):
+            spline = CubicSpline(m, c)
+            m_mid = 0.5 * (m[1:] + m[:-1])
+            c_mid = critical_value(m_mid, 1.0, alpha, exact=True)
+            err = np.abs(spline(m_mid) - c_mid)
+            bad = np.flatnonzero(err > 0.5 * tol)
+            if not bad.size:
+                break
+            if i == maxiter:
+                logging.warn('CriticalValueInterpolant(alpha={}): tolerance {} not reached after {} refinements (error {})'.format(alpha, tol, maxiter, err.max()))
+                break
+            m = np.insert(m, bad + 1, m_mid[bad])
+            c = np.insert(c, bad + 1, c_mid[bad])
+
+        self.m = m
+        self.c = c
+        self.max_error = err.max()
+        self._spline = spline
+
+    def __call__(self, m):
+        """Look up the critical value(s) for `m = mu/sigma`."""
+        m = np.asarray(m, dtype=float)
+        sol = np.where(m < self.m_max,
+                       self._spline(np.clip(m, 0.0, self.m_max)),
+                       self.c_inf)
+        neg = m <= 0.0
+        if neg.any():
+            sol = np.where(neg, critical_value(np.fmin(m, 0.0), 1.0, self.alpha, exact=True), sol)
+        return sol[()]
+
+
+_interpolants = {}
+
+def critical_value_interpolant(alpha):
+    """Get the (cached) :class:`CriticalValueInterpolant` for `alpha`."""
+    alpha = float(alpha)
+    if alpha not in _interpolants:
+        _interpolants[alpha] = CriticalValueInterpolant(alpha)
+    return _interpolants[alpha]
+
+def neg_2_log_likelihood_ratio(mu_test, x, sigma=1.0):
     """Calculate -2log(likelihood ratio).
 
     Parameters
@@ -116,6 +315,8 @@ def neg_2_log_likelihood_ratio(mu_test, x):
         The assumed expectation value of the distribution.
     x : float
         The measured value.
+    sigma : float, optional
+        The std.deviation of the distribution.
 
     Returns
     -------
@@ -123,9 +324,9 @@ def neg_2_log_likelihood_ratio(mu_test, x):
         :math:`\lambda = -2\log(\Lamba)`.
     """
     if x > 0:
-        return (x - mu_test)**2
+        return (x - mu_test)**2 / sigma**2
     else:
-        return mu_test * (mu_test - 2*x)
+        return mu_test * (mu_test - 2*x) / sigma**2
 
 def fit_mu(x):
     """The positive-confined best-fit for the expectation value.
@@ -137,7 +338,7 @@ def fit_mu(x):
     """
     return max(x, 0.0)
 
-def upper_limit(x, sigma, cl):
+def upper_limit(x, sigma, cl, fast=True):
     """Calculate the upper limit
 
     Parameters
@@ -148,27 +349,34 @@ def upper_limit(x, sigma, cl):
         The std.deviation of the distribution.
     cl : float
         The confidence level.
+    fast : bool, optional
+        Return the closed form far from the boundary (see
+        :func:`is_central`). Set to `False` to force the full calculation.
 
     Returns
     -------
     sol : float
         The upper limit of the confidence interval.
     """
+    z = special.ndtri(0.5 * (1.0 + cl))
+    if fast and x >= 0.0:
+        # mu >= z*sigma is accepted for x in [mu - z*sigma, mu + z*sigma]
+        return x + z * sigma
+
     alpha = 1.0 - cl
     mu_hat = fit_mu(x)
 
     def diff(mu):
-        return critical_value(mu, sigma, alpha) - neg_2_log_likelihood_ratio(mu, x)
-    assert diff(mu_hat) > 0
+        return critical_value(mu, sigma, alpha) - neg_2_log_likelihood_ratio(mu, x, sigma)
 
-    n = 1
-    while diff(mu_hat + n * sigma) > 0:
-        n *= 2
+    # Start from the central interval, which is the asymptotic solution.
+    u, v = upper_bracket(diff, mu_hat, mu_hat + sigma, mu_hat + z * sigma, 0.25 * sigma,
+                         origin=mu_hat, strict=True)
 
-    sol = bisect(diff, mu_hat, mu_hat + n * sigma)
+    sol = bisect(diff, u, v)
     return sol
 
-def lower_limit(x, sigma, cl):
+def lower_limit(x, sigma, cl, fast=True):
     """Calculate the lower limit of the confidence interval for the expecation value.
 
     Parameters
@@ -179,12 +387,18 @@ def lower_limit(x, sigma, cl):
         The std.deviation of the distribution.
     cl : float
         The confidence level.
+    fast : bool, optional
+        Return the closed form far from the boundary (see
+        :func:`is_central`). Set to `False` to force the full calculation.
 
     Returns
     -------
     sol : float
         The lower limit of the confidence interval.
     """
+    if fast and is_central(x, sigma, cl):
+        return x - special.ndtri(0.5 * (1.0 + cl)) * sigma
+
     alpha = 1.0 - cl
     mu_hat = fit_mu(x)
 
@@ -192,32 +406,392 @@ def lower_limit(x, sigma, cl):
         return 0.0
 
     def diff(mu):
-        return critical_value(mu, sigma, alpha) - neg_2_log_likelihood_ratio(mu, x)
-    assert diff(mu_hat) > 0
+        return critical_value(mu, sigma, alpha) - neg_2_log_likelihood_ratio(mu, x, sigma)
 
+    # NOTE: `bisect` raises if `diff(mu_hat) > 0` does not hold.
     if diff(0.0) >= 0.0:
         return 0.0
 
     sol = bisect(diff, 0.0, mu_hat)
     return sol
 
-def confidence_interval(x, sigma, cl):
+def confidence_interval(x, sigma, cl, fast=True):
     """Calculate the confidence interval for the positive-constrained expectation value.
 
+    If `cl` is an array, the intervals for all confidence levels are
+    calculated together: the limits of all levels are solved for
+    simultaneously by a vectorized Illinois (regula falsi) iteration, which
+    evaluates the likelihood ratio and critical values once per step for all
+    levels.
+
     Parameters
     ----------
     x : float
         The measured value.
     sigma : float
         The std.deviation of the distribution.
+    cl : float or ndarray
+        The confidence level(s).
+    fast : bool, optional
+        Return the closed form far from the boundary (see
+        :func:`is_central`). Set to `False` to force the full calculation.
+
+    Returns
+    -------
+    ll, ul : float or ndarray
+        The lower and upper limits of the confidence interval, with the
+        shape of `cl`.
+    """
+    if np.ndim(cl) > 0:
+        return _confidence_interval_levels(x, sigma, np.asarray(cl, dtype=float), fast)
+
+    ll = lower_limit(x, sigma, cl, fast)
+    ul = upper_limit(x, sigma, cl, fast)
+    return ll, ul
+
+def _confidence_interval_levels(x, sigma, cl, fast):
+    """Calculate the confidence intervals for an array of confidence levels."""
+    z = special.ndtri(0.5 * (1.0 + cl.ravel()))
+    alpha = 1.0 - cl.ravel()
+    mu_hat = fit_mu(x)
+
+    def diff(mu, alpha):
+        return critical_value(mu, sigma, alpha) - neg_2_log_likelihood_ratio(mu, x, sigma)
+
+    # The acceptance interval of mu >= z*sigma is [mu - z*sigma, mu + z*sigma],
+    # hence the upper limit is below mu_hat + (z + 1)*sigma.
+    if fast and x >= 0.0:
+        ul = x + z * sigma
+    else:
+        ul = illinois_batch(diff, mu_hat, mu_hat + (z + 1.0) * sigma,
+                            xtol=2e-12 * sigma, ftol=0.0, args=(alpha,))
+
+    ll = np.zeros(z.shape)
+    if mu_hat > 0.0:
+        central = np.asarray(fast & is_central(x, sigma, cl.ravel()))
+        ll[central] = x - z[central] * sigma
+        sel = np.flatnonzero(~central)
+        sel = sel[diff(np.zeros(sel.size), alpha[sel]) < 0.0]
+        if sel.size:
+            ll[sel] = illinois_batch(diff, 0.0, np.full(sel.size, mu_hat),
+                                     xtol=2e-12 * sigma, ftol=0.0, args=(alpha[sel],))
+
+    return ll.reshape(cl.shape), ul.reshape(cl.shape)
+
+def is_central(x, sigma, cl):
+    """Test whether the unified interval is the central interval `x +- z*sigma`.
+
+    For :math:`\mu \geq z\sigma` the critical value is the
+    :math:`\chi^2_1` quantile :math:`z^2` and the acceptance interval is
+    :math:`[\mu - z\sigma, \mu + z\sigma]`. Hence, the lower limit is
+    :math:`x - z\sigma` for :math:`x \geq 2z\sigma` and the upper limit is
+    :math:`x + z\sigma` for :math:`x \geq 0`.
+
+    Parameters
+    ----------
+    x : float or ndarray
+        The measured value.
+    sigma : float or ndarray
+        The std.deviation of the distribution.
     cl : float
         The confidence level.
 
     Returns
     -------
-    ll, ul : float
-        The lower and upper limits of the confidence interval.
+    central : bool or ndarray of bool
+        Whether both limits are given by the central interval.
     """
-    ll = lower_limit(x, sigma, cl)
-    ul = upper_limit(x, sigma, cl)
-    return ll, ul
+    return np.asarray(x) >= 2 * special.ndtri(0.5 * (1.0 + cl)) * np.asarray(sigma)
+
+
+def acceptance_interval(mu, sigma, cl, exact=False):
+    """Calculate the acceptance interval `[x1, x2]` of the confidence belt.
+
+    The measurement `x` is accepted for `mu` if
+    :math:`\lambda(\mu; x) \leq c(\mu)`. With :math:`r = \sqrt{c(\mu)}\sigma`
+    this gives :math:`x_2 = \mu + r` and :math:`x_1 = \mu - r` for
+    :math:`\mu > r` or :math:`x_1 = (\mu^2 - r^2) / (2\mu)` otherwise.
+    All arguments are broadcast against each other.
+
+    Parameters
+    ----------
+    mu : float or ndarray
+        The expectation value (:math:`\mu \geq 0`).
+    sigma : float or ndarray
+        The std.deviation of the distribution.
+    cl : float or ndarray
+        The confidence level.
+    exact : bool, optional
+        Passed to :func:`critical_value`.
+
+    Returns
+    -------
+    x1, x2 : float or ndarray
+        The lower and upper edges of the acceptance intervals. `x1` is
+        `-inf` for `mu == 0`.
+    """
+    mu, sigma, cl = np.broadcast_arrays(np.asarray(mu, dtype=float),
+                                        np.asarray(sigma, dtype=float),
+                                        np.asarray(cl, dtype=float))
+    r = np.sqrt(critical_value(mu, sigma, 1.0 - cl, exact)) * sigma
+    x2 = mu + r
+    # For `mu == 0` all `x < 0` are accepted (`r` is 0 for `cl <= 0.5`).
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x1 = np.where(mu > r, mu - r, (mu**2 - r**2) / (2 * mu))
+    x1[mu == 0] = -np.inf
+    return x1[()], x2[()]
+
+def coverage(mu, sigma, cl, exact=False):
+    """Calculate the coverage of the confidence intervals analytically.
+
+    The interval of `x` covers `mu` iff `x` is in the acceptance interval
+    :math:`[x_1(\mu), x_2(\mu)]` (see :func:`acceptance_interval`), so the
+    coverage is :math:`\Phi((x_2 - \mu)/\sigma) - \Phi((x_1 - \mu)/\sigma)`.
+    With the interpolated critical values it deviates from `cl` by the
+    interpolation error only. All arguments are broadcast against each
+    other.
+
+    Parameters
+    ----------
+    mu : float or ndarray
+        The true expectation value (:math:`\mu \geq 0`).
+    sigma : float or ndarray
+        The std.deviation of the distribution.
+    cl : float or ndarray
+        The confidence level.
+    exact : bool, optional
+        Passed to :func:`critical_value`.
+
+    Returns
+    -------
+    cov : float or ndarray
+        The probability of the confidence interval to contain `mu`.
+    """
+    x1, x2 = acceptance_interval(mu, sigma, cl, exact)
+    return special.ndtr((x2 - mu) / sigma) - special.ndtr((x1 - mu) / sigma)
+
+
+def confidence_interval_batch(x, sigma, cl):
+    """Calculate the confidence intervals for arrays of measurements.
+
+    The intervals are scale invariant, so all measurements share one
+    :class:`GaussianBelt` (built on first use for each `cl`). The results
+    agree with :func:`confidence_interval` within the belt tolerance.
+
+    Parameters
+    ----------
+    x : float or ndarray
+        The measured values.
+    sigma : float or ndarray
+        The std.deviations of the distribution, broadcast against `x`.
+    cl : float
+        The confidence level.
+
+    Returns
+    -------
+    ll, ul : ndarray
+        The lower and upper limits of the confidence intervals.
+    """
+    return gaussian_belt(cl).confidence_interval(x, sigma)
+
+
+def expected_upper_limit(mu, sigma, cl, quantiles=None):
+    """Calculate quantiles of the upper limit distribution (expected limits).
+
+    The upper limit is monotonically increasing in `x`, so the
+    `q`-quantile of the upper limits for true value `mu` is the upper limit
+    for the `q`-quantile of `x`, :math:`\mu + \sigma\Phi^{-1}(q)`. The
+    limits are calculated with :func:`gaussian_belt`.
+
+    Parameters
+    ----------
+    mu : float or ndarray
+        The true expectation value.
+    sigma : float or ndarray
+        The std.deviation of the distribution.
+    cl : float or ndarray
+        The confidence level. `mu`, `sigma` and `cl` are broadcast against
+        each other.
+    quantiles : sequence of float, optional
+        The quantiles to calculate. Default are the median and the
+        :math:`\pm 1\sigma` and :math:`\pm 2\sigma` bands, i.e.
+        `Phi([-2, -1, 0, 1, 2])`.
+
+    Returns
+    -------
+    ul : ndarray
+        The upper limit quantiles with the broadcast shape of `mu`,
+        `sigma` and `cl` plus a last axis for the quantiles.
+    """
+    if quantiles is None:
+        quantiles = special.ndtr(np.arange(-2.0, 3.0))
+    mu, sigma, cl = np.broadcast_arrays(np.asarray(mu, dtype=float),
+                                        np.asarray(sigma, dtype=float),
+                                        np.asarray(cl, dtype=float))
+    sigma = sigma[..., np.newaxis]
+    x = mu[..., np.newaxis] + sigma * special.ndtri(np.asarray(quantiles, dtype=float))
+
+    ul = np.empty(x.shape)
+    for c in np.unique(cl):
+        sel = cl == c
+        ul[sel] = gaussian_belt(c).upper_limit(x[sel], sigma[sel])
+    return ul
+
+
+_belts = {}
+
+def gaussian_belt(cl):
+    """Get the (cached) :class:`GaussianBelt` for `cl`."""
+    cl = float(cl)
+    if cl not in _belts:
+        _belts[cl] = GaussianBelt(cl)
+    return _belts[cl]
+
+
+class GaussianBelt(object):
+    """The confidence belt for a fixed confidence level in units of `sigma`.
+
+    The acceptance intervals :math:`[x_1(\mu), x_2(\mu)]` are tabulated once
+    and the limits are found by inverting them with :func:`numpy.interp`,
+    i.e. a query costs a binary search in the tables. The tables are refined
+    until the interpolation error of the limits at the midpoints of all
+    table intervals is below `tol/2` (in units of `sigma`).
+
+    Outside of the tables the limits are calculated in closed form:
+
+    * `x <= sqrt(c(0))`: lower limit 0.
+    * `x >= 2 sqrt(c_inf)`: lower limit `x - sqrt(c_inf)`.
+    * `x >= 0`: upper limit `x + sqrt(c_inf)`.
+
+    where `c_inf` is the :math:`\chi^2_1` quantile. Only upper limits for
+    `x < x_min` fall back to :func:`upper_limit`. For `cl <= 0.5`, `c(0)` is
+    0 and the lower edge of the acceptance intervals stays above `x_min`
+    for :math:`\mu \to 0`; the upper limit below it is 0.
+
+    Parameters
+    ----------
+    cl : float
+        The confidence level.
+    tol : float, optional
+        The targeted absolute accuracy of the limits in units of `sigma`
+        with respect to :func:`confidence_interval`.
+    x_min : float, optional
+        The lowest measurement (in units of `sigma`) covered by the table
+        for the upper limits.
+    maxiter : int, optional
+        The maximum number of table refinements. If `tol` is not reached
+        afterwards, a warning is logged.
+
+    Examples
+    --------
+    >>> belt = GaussianBelt(0.9)
+    >>> ll, ul = belt.confidence_interval([-1.0, 0.5, 3.0], 1.0)
+    """
+    def __init__(self, cl, tol=1e-8, x_min=-10.0, maxiter=20):
+        self.cl = cl
+        self.tol = tol
+        self.x_min = x_min
+
+        interp = critical_value_interpolant(1.0 - cl)
+        self._r_inf = np.sqrt(interp.c_inf)
+
+        def x1(mu):
+            r = np.sqrt(interp(mu))
+            return np.where(mu > r, mu - r, (mu**2 - r**2) / (2*mu))
+
+        def x2(mu):
+            return mu + np.sqrt(interp(mu))
+
+        # x1(mu) ~ -c(0) / (2*mu) for small mu
+        mu_min = 0.25 * interp(0.0) / abs(x_min)
+        n_halve = 0
+        while mu_min > 0.0 and x1(mu_min) > x_min and n_halve < 64:
+            mu_min *= 0.5
+            n_halve += 1
+        if mu_min > 0.0 and x1(mu_min) <= x_min:
+            mu1 = np.geomspace(mu_min, self._r_inf, 65)
+        else:
+            # For cl <= 0.5, c(0) == 0 and x1(mu) stays finite for mu -> 0:
+            # the upper limit of smaller `x` is 0 (see `upper_limit`).
+            mu1 = np.linspace(0.0, self._r_inf, 65)
+            mu1[0] = tol * self._r_inf
+
+        self._x1, self._mu1 = self._tabulate(x1, mu1, maxiter)
+        self._x2, self._mu2 = self._tabulate(x2, np.linspace(0.0, self._r_inf, 65), maxiter)
+
+    def _tabulate(self, curve, mu, maxiter):
+        """Tabulate the monotone `curve(mu)` for linear inversion."""
+        x = curve(mu)
+        for i in range(maxiter + 1):
+            mu_mid = 0.5 * (mu[1:] + mu[:-1])
+            x_mid = curve(mu_mid)
+            err = np.abs(np.interp(x_mid, x, mu) - mu_mid)
+            bad = np.flatnonzero(err > 0.5 * self.tol)
+            if not bad.size:
+                break
+            if i == maxiter:
+                logging.warn('GaussianBelt(cl={}): tolerance {} not reached after {} refinements (error {})'.format(self.cl, self.tol, maxiter, err.max()))
+                break
+            mu = np.insert(mu, bad + 1, mu_mid[bad])
+            x = np.insert(x, bad + 1, x_mid[bad])
+        return x, mu
+
+    def lower_limit(self, x, sigma=1.0):
+        """Calculate the lower limit(s) for measurement(s) `x`.
+
+        Parameters
+        ----------
+        x : float or ndarray
+            The measured value(s).
+        sigma : float or ndarray, optional
+            The std.deviation(s) of the distribution.
+
+        Returns
+        -------
+        ll : float or ndarray
+            The lower limit(s) of the confidence interval.
+        """
+        z = np.asarray(x, dtype=float) / sigma
+        ll = np.where(z >= self._x2[-1], z - self._r_inf,
+                      np.interp(z, self._x2, self._mu2, left=0.0))
+        return (ll * sigma)[()]
+
+    def upper_limit(self, x, sigma=1.0):
+        """Calculate the upper limit(s) for measurement(s) `x`.
+
+        Parameters
+        ----------
+        x : float or ndarray
+            The measured value(s).
+        sigma : float or ndarray, optional
+            The std.deviation(s) of the distribution.
+
+        Returns
+        -------
+        ul : float or ndarray
+            The upper limit(s) of the confidence interval.
+        """
+        z = np.asarray(x, dtype=float) / sigma
+        ul = np.where(z >= 0.0, z + self._r_inf, np.interp(z, self._x1, self._mu1))
+        low = z < self._x1[0]
+        if low.any():
+            ul[low] = [upper_limit(zi, 1.0, self.cl) for zi in z[low]]
+        return (ul * sigma)[()]
+
+    def confidence_interval(self, x, sigma=1.0):
+        """Calculate the confidence interval(s) for measurement(s) `x`.
+
+        Parameters
+        ----------
+        x : float or ndarray
+            The measured value(s).
+        sigma : float or ndarray, optional
+            The std.deviation(s) of the distribution.
+
+        Returns
+        -------
+        ll, ul : float or ndarray
+            The lower and upper limits of the confidence interval.
+        """
+        return self.lower_limit(x, sigma), self.upper_limit(x, sigma)
+
@@ -10,8 +10,15 @@ Functions of Interest
 ---------------------
 
 * :func:`confidence_interval`
+* :func:`confidence_interval_batch`
+* :func:`confidence_interval_scan`
+* :func:`asymptotic_confidence_interval`
+* :func:`breakpoint_solver`
+* :func:`critical_value_curve`
 * :func:`lower_limit`
 * :func:`upper_limit`
+* :func:`acceptance_interval`
+* :class:`PoissonBelt`
 
 Todo
 ----
@@ -20,10 +27,25 @@ Treat `b == 0`.
 from __future__ import print_function, division, absolute_import
 import numpy as np
 import logging
+from collections import namedtuple
 # from scipy import stats
-from scipy import special
+from scipy import special, optimize
 
-from .tools import bisect
+from functools import partial
+
+from . import simple_gaussian
+from .tools import bisect, bisect_batch, ksection, upper_bracket, bisection_bracket, memoize
+
+#: Thresholds `(n_min, b_min)` above which (both) :func:`lower_limit`,
+#: :func:`upper_limit` and :func:`confidence_interval` switch to the
+#: asymptotic limits (see :func:`asymptotic_confidence_interval`) if
+#: called with `asymptotic=True`.
+ASYMPTOTIC_THRESHOLDS = (1000, 1000.0)
+
+#: Bound for the deviation of the asymptotic from the exact limits on the
+#: validated grid (see :func:`asymptotic_confidence_interval`; used by
+#: :func:`validate_asymptotic`).
+ASYMPTOTIC_TOLERANCE = 1.0
 
 def poisson_pmf(k, mu):
     """Calculate the Poissonian PMF.
@@ -118,8 +140,31 @@ def likelihood_ratio(n, b, t):
     lr : float
         The likelihood ratio.
     """
+    return np.exp(log_likelihood_ratio(n, b, t))
+
+
+def log_likelihood_ratio(n, b, t):
+    """The logarithm of :func:`likelihood_ratio`.
+
+    It is calculated as :math:`n \\log((t+b)/(\\hat t+b)) + \\hat t - t`
+    with :func:`scipy.special.xlogy`, which does not overflow for large `n`.
+
+    Parameters
+    ----------
+    n : int
+        The number of observed events.
+    b : float
+        The background rate.
+    t : float
+        The assumed theta value.
+
+    Returns
+    -------
+    log_lr : float
+        The logarithm of the likelihood ratio.
+    """
     t_fit = fit_theta(n, b)
-    return ((t + b) / (t_fit + b))**n * np.exp(t_fit - t)
+    return special.xlogy(n, t + b) - special.xlogy(n, t_fit + b) + t_fit - t
 
 
 def critical_value(b, t, alpha):
@@ -130,6 +175,17 @@ def critical_value(b, t, alpha):
     .. math::
         Prob( L < L_{{crit}}; t) <= \alpha = 1 - clvl
 
+    The underlying acceptance states are cached (see
+    :func:`~unified_ci.tools.memoize`) and shared between all intervals
+    calculated in the process.
+
+    The acceptance region is grown outward from the mode of the likelihood
+    ratio (see `_critical_state`); the critical value is the same as from
+    sorting all `n` up to `n_max` by their likelihood ratio, including the
+    order of equal ratios. Since :func:`likelihood_ratio` is evaluated in
+    log form, the values differ from the former power form by a few ulp
+    (about `1e-14` relative).
+
     Parameters
     ----------
     b : float
@@ -144,6 +200,24 @@ def critical_value(b, t, alpha):
     lr_crit : float
         The critical likelihood ratio value.
     """
+    return _critical_state(b, t, alpha).crit
+
+
+# The state of the Neyman construction at `t`: the critical value `crit`
+# (the likelihood ratio of `k`, the first rejected `n`), the accepted
+# interval `[n1, n2]`, the last accepted `m` and `n_max` (see
+# `_critical_state`). `k` is None if all `n` up to the lumped tail are
+# accepted.
+_CriticalState = namedtuple('_CriticalState', ['crit', 'n1', 'n2', 'k', 'm', 'n_max'])
+
+
+@memoize(maxsize=2**16)
+def _critical_state(b, t, alpha):
+    """Calculate the critical value and the acceptance state (see :func:`critical_value`).
+
+    The results are cached (see :func:`~unified_ci.tools.memoize`) and
+    shared between all intervals calculated in the process.
+    """
     # poi = stats.poisson(b+t)
     mu = b + t
 
@@ -157,42 +231,354 @@ def critical_value(b, t, alpha):
     # NOTE: SF(M) = P[n > M] = P[n >= M+1]
     # p_thresh = min(alpha, poi.pmf(0))
     p_thresh = min(alpha, poisson_pmf(0, mu))
-    # n_max = int(poi.isf(p_thresh)) + 1
-    n_max = poisson_minor_isf(p_thresh, mu)
-
-    # n_p_lr = [(n_max, poi.sf(n_max), likelihood_ratio(n_max+1, b, t))]
-    n_p_lr = [(n_max, poisson_sf(n_max, mu), likelihood_ratio(n_max+1, b, t))]
-    # n_p_lr.extend((n, poi.pmf(n), likelihood_ratio(n, b, t)) for n in xrange(n_max+1))
-    n_p_lr.extend((n, poisson_pmf(n, mu), likelihood_ratio(n, b, t)) for n in xrange(n_max+1))
-    n_p_lr = sorted(n_p_lr, key=operator.itemgetter(2))
-
-    p_cum = 0.0
-    for i, (n, p, lr) in enumerate(n_p_lr):
-        p_cum += p
-        if p_cum >= alpha:
-            if i == 0:
-                # TODO: is this the proper way to deal with this?
-                logging.warn('i==0: algorithm failed for b={} t={} alpha={}: accepting overcoverage!'.format(b, t, alpha))
-                return n_p_lr[i][2]
-            return n_p_lr[i-1][2]
-    raise RuntimeError('this should never raise!')
+    # The upper tail `n > n_max` is lumped into one entry `n_max + 1`.
+    #
+    # The likelihood ratio is unimodal in `n` with its maximum at `n ~ mu`,
+    # so the acceptance region is grown outward from the mode: ordering by
+    # descending likelihood ratio merges the two monotonic flanks, and the
+    # accepted `n` after `j` steps are the interval `[n1[j], n2[j]]`. The
+    # acceptance region is complete as soon as the rejected probability
+    # `CDF(n1[j] - 1) + SF(n2[j])` is below `alpha`, and the critical value
+    # is the likelihood ratio of the next `n`. Only a window around the mode
+    # is considered, which is widened if the region reaches one of its
+    # edges. `n_max` is only needed if it is inside of the window.
+    n_mode = int(np.floor(mu))
+    width = int(np.ceil(4.0 * np.sqrt(mu))) + 4
+    while True:
+        lo = max(0, n_mode - width)
+        ns = np.arange(lo, n_mode + width + 1)
+        n_max = None
+        if poisson_sf(ns[-2], mu) <= p_thresh:
+            n_max = ns[np.argmax(poisson_sf(ns[:-1], mu) <= p_thresh)]
+            ns = ns[:n_max - lo + 2]
+        lr = likelihood_ratio(ns, b, t)
+        # For equal likelihood ratios, the larger `n` is accepted first but
+        # the lumped upper tail last.
+        rank = np.arange(ns.size)
+        if n_max is not None:
+            rank[-1] = -1
+        order = np.lexsort((-rank, -lr))
+        n1 = np.minimum.accumulate(ns[order])
+        n2 = np.maximum.accumulate(ns[order])
+
+        def p_rej(j):
+            p = special.pdtr(n1[j] - 1, mu) if n1[j] > 0 else 0.0
+            if n_max is None or n2[j] <= n_max:
+                p += poisson_sf(n2[j], mu)
+            return p
+
+        # `p_rej` is decreasing, bisect for the first `j` with `p_rej(j) < alpha`
+        j0, j = -1, ns.size - 1
+        if p_rej(j) < alpha:
+            while j - j0 > 1:
+                jm = (j0 + j) // 2
+                if p_rej(jm) < alpha:
+                    j = jm
+                else:
+                    j0 = jm
+            if (lo == 0 or n1[j] > lo) and (n_max is not None or n2[j] < ns[-1]):
+                break
+        if lo == 0 and n_max is not None:
+            raise RuntimeError('this should never raise!')
+        width *= 2
+
+    m = ns[order[j]]
+    if j == ns.size - 1:
+        # TODO: is this the proper way to deal with this?
+        logging.warn('i==0: algorithm failed for b={} t={} alpha={}: accepting overcoverage!'.format(b, t, alpha))
+        return _CriticalState(lr[order[j]], n1[j], n2[j], None, m, n_max)
+    return _CriticalState(lr[order[j+1]], n1[j], n2[j], ns[order[j+1]], m, n_max)
+
+
+def critical_value_curve(b, ts, alpha, chunk_size=2**20):
+    """Calculate the critical values for an array of signal rates.
+
+    This is the array version of :func:`critical_value` with identical
+    results. The likelihood ratios of all `(t, n)` pairs are calculated as
+    a matrix, sorted row-wise and the accepted intervals are accumulated
+    along the rows. The signal rates are processed in ascending order and
+    in chunks of at most `chunk_size` matrix elements; each chunk covers
+    the `n` from a window around the means of its rows. Rows where the
+    acceptance region reaches the edge of the window are calculated with
+    :func:`critical_value`.
+
+    Parameters
+    ----------
+    b : float
+        Background rate.
+    ts : ndarray
+        Signal rates.
+    alpha : float
+        Lower-tail probability (:math:`\\alpha = 1 - clvl`).
+    chunk_size : int, optional
+        The maximum number of elements of the `(t, n)` matrices.
+
+    Returns
+    -------
+    lr_crit : ndarray
+        The critical likelihood ratio values with the shape of `ts`.
+    """
+    ts = np.asarray(ts, dtype=float)
+    flat = ts.ravel()
+    sort = np.argsort(flat)
+    crit = np.empty(flat.size)
+
+    def window(mu):
+        return int(np.ceil(6.0 * np.sqrt(mu))) + 6
+
+    i = 0
+    while i < flat.size:
+        mu0 = b + flat[sort[i]]
+        rows = max(1, chunk_size // (2 * window(mu0) + 2))
+        while True:
+            ts_chunk = flat[sort[i:i + rows]]
+            lo = max(0, int(np.floor(b + ts_chunk[0])) - window(b + ts_chunk[0]))
+            hi = int(np.floor(b + ts_chunk[-1])) + window(b + ts_chunk[-1])
+            if rows == 1 or len(ts_chunk) * (hi - lo + 1) <= chunk_size:
+                break
+            rows //= 2
+        crit[sort[i:i + rows]] = _critical_value_rows(b, ts_chunk, alpha, lo, hi)
+        i += rows
+
+    return crit.reshape(ts.shape)
+
+
+def _critical_value_rows(b, ts, alpha, lo, hi):
+    """Calculate the critical values for the signal rates `ts` with `n` in `[lo, hi]`."""
+    mus = b + ts
+    ns = np.arange(lo, hi + 1)
+    p_thresh = np.minimum(alpha, poisson_pmf(0, mus))
+
+    # `n_max` (see `critical_value`), the tail `n > n_max` is lumped into
+    # `n_max + 1`. `SF` is decreasing, bisect for the first `n` below `p_thresh`.
+    has_max = poisson_sf(hi - 1, mus) <= p_thresh
+    n0 = np.full(len(ts), lo - 1)
+    n_max = np.full(len(ts), hi - 1)
+    while np.any(n_max - n0 > 1):
+        nm = (n0 + n_max) // 2
+        below = poisson_sf(np.maximum(nm, lo), mus) <= p_thresh
+        n_max = np.where(below & (nm > n0), nm, n_max)
+        n0 = np.where(~below & (nm > n0), nm, n0)
+    n_max = np.where(has_max, n_max, hi)
+    size = np.where(has_max, n_max + 2 - lo, ns.size)
+    valid = np.arange(ns.size) < size[:, np.newaxis]
+
+    lr = np.where(valid, likelihood_ratio(ns, b, ts[:, np.newaxis]), -np.inf)
+    rank = np.where(has_max[:, np.newaxis] & (ns == (n_max + 1)[:, np.newaxis]), -1, ns)
+    order = np.lexsort((-rank, -lr), axis=-1)
+    r = np.arange(len(ts))
+    lr = lr[r[:, np.newaxis], order]
+    n1 = np.minimum.accumulate(ns[order], axis=1)
+    n2 = np.maximum.accumulate(ns[order], axis=1)
+
+    def p_rej(j):
+        a1, a2 = n1[r, j], n2[r, j]
+        p = np.where(a1 > 0, special.pdtr(a1 - 1, mus), 0.0)
+        return p + np.where(~has_max | (a2 <= n_max), poisson_sf(a2, mus), 0.0)
+
+    # bisect all rows for the first `j` with `p_rej(j) < alpha`
+    j0 = np.full(len(ts), -1)
+    j = size - 1
+    found = p_rej(j) < alpha
+    while np.any(j - j0 > 1):
+        jm = (j0 + j) // 2
+        below = p_rej(np.maximum(jm, 0)) < alpha
+        j = np.where(below & (jm > j0), jm, j)
+        j0 = np.where(~below & (jm > j0), jm, j0)
+
+    crit = lr[r, np.minimum(j + 1, ns.size - 1)]
+    # rows where the acceptance region is not inside of the window (or
+    # everything is accepted, which `critical_value` warns about)
+    redo = (~found | (j == size - 1) | ((lo > 0) & (n1[r, j] <= lo))
+            | (~has_max & (n2[r, j] >= hi)))
+    for k in np.flatnonzero(redo):
+        crit[k] = critical_value(b, ts[k], alpha)
+    return crit
+
+
+class _DeltaFunc(object):
+    """The 'likelihood ratio minus critical value' function `delta(t)`.
+
+    A module level class instead of a closure, so that `delta` can be
+    pickled for process pools (see :func:`~unified_ci.tools.ksection`).
+    The attributes `n`, `b` and `alpha` are used by
+    :func:`breakpoint_solver`.
+    """
+    def __init__(self, n, b, clvl):
+        self.n = n
+        self.b = b
+        self.alpha = 1.0 - clvl
+
+    def __call__(self, t):
+        return likelihood_ratio(self.n, self.b, t) - critical_value(self.b, t, self.alpha)
 
 
 def mk_delta_func(n, b, clvl):
     """Prepare 'likelihood ratio minus critical value' function."""
-    alpha = 1.0 - clvl
-    cache = {}
-    def delta(t):
-        if t not in cache:
-            r = likelihood_ratio(n, b, t) - critical_value(b, t, alpha)
-            cache[t] = r
-        else:
-            r = cache[t]
-        return r
-    return delta
+    return _DeltaFunc(n, b, clvl)
+
 
+def _lr_crossing(x, y, b):
+    """The signal rate where `likelihood_ratio(x, b, t) == likelihood_ratio(y, b, t)`.
 
-def lower_limit(n, b, clvl, delta=None):
+    The log-likelihood ratio is :math:`x\\log(t+b) - c_x - t` with a constant
+    :math:`c_x`, so the crossing is :math:`t = \\exp((c_x - c_y)/(x - y)) - b`.
+    """
+    cx = special.xlogy(x, fit_theta(x, b) + b) - fit_theta(x, b)
+    cy = special.xlogy(y, fit_theta(y, b) + b) - fit_theta(y, b)
+    return np.exp((cx - cy) / (x - y)) - b
+
+
+def _p_reject(n1, n2, mu):
+    """The probability to measure `n` outside of `[n1, n2]`."""
+    p = special.pdtr(n1 - 1, mu) if n1 > 0 else 0.0
+    return p + poisson_sf(n2, mu)
+
+
+def _piece_end(st, b, alpha, t, end):
+    """The nearest point in `(t, end)` where the acceptance state `st` changes.
+
+    The state changes where the likelihood ratios of the critical `k`, the
+    last accepted `m`, the other neighbour of the accepted interval or the
+    edges of the interval cross, or where the rejected probability of the
+    accepted interval (with or without `m`) crosses `alpha`, or `n_max`
+    changes.
+    """
+    k, m, n1, n2 = st.k, st.m, st.n1, st.n2
+    pairs = [(n1, n2)]
+    if k is not None:
+        other = n1 - 1 if k == n2 + 1 else n2 + 1
+        pairs.append((k, m))
+        if other >= 0:
+            pairs.append((k, other))
+    events = [_lr_crossing(x, y, b) for x, y in pairs if x != y]
+
+    funcs = []
+    for i1, i2 in ((n1, n2), (n1 + (m == n1), n2 - (m == n2 and m != n1))):
+        if i1 <= i2:
+            funcs.append(lambda u, i1=i1, i2=i2: _p_reject(i1, i2, b + u) - alpha)
+    if st.n_max is not None:
+        # `n_max` changes where `SF(n_max - 1)` or `SF(n_max)` cross `p_thresh`
+        for i in (st.n_max - 1, st.n_max):
+            funcs.append(lambda u, i=i: poisson_sf(i, b + u) - min(alpha, poisson_pmf(0, b + u)))
+    a = t + 1e-9 * (end - t)
+    for f in funcs:
+        if np.sign(f(a)) != np.sign(f(end)):
+            events.append(optimize.brentq(f, a, end, xtol=1e-15))
+
+    s = np.sign(end - t)
+    events = [e for e in events if 0.0 < s * (e - t) and s * (e - end) < 0.0]
+    if not events:
+        return end
+    return t + s * min(s * (e - t) for e in events)
+
+
+def _breakpoint_fallback(f, a, b, xtol, args, reason):
+    """Log why :func:`breakpoint_solver` falls back to bisection and bisect."""
+    logging.warn('breakpoint_solver: {} in [{}, {}], falling back to bisect with xtol={}'.format(reason, a, b, xtol))
+    return bisect(f, a, b, xtol=xtol, args=args)
+
+
+def breakpoint_solver(f, a, b, xtol=1e-2, coarse=0.5, maxiter=32, args=None):
+    """Find the limit where `delta(t)` changes its sign to machine precision.
+
+    `delta(t)` (see :func:`mk_delta_func`) is piecewise smooth: between the
+    points where the acceptance state (see :func:`critical_value`) changes
+    it is :math:`\\Lambda(n, t) - \\Lambda(k, t)` for a fixed critical `k`,
+    whose root is known analytically (see :func:`_lr_crossing`). The
+    bracket is bisected to the width `coarse`, then the pieces are walked
+    from `a` towards `b`: the state is calculated at the start of each
+    piece and the end of the piece is found from the crossings of the
+    likelihood ratios and of the rejected probability (with
+    :func:`scipy.optimize.brentq`). The limit is either the root inside of
+    a piece or the start of the first piece where `n` is rejected.
+
+    The pieces are modelled with the parameters `n`, `b` and `alpha`, which
+    :func:`mk_delta_func` sets as attributes of `delta`. All signs are
+    taken from `f` itself, so wrappers of `delta` (carrying its attributes)
+    may override `f` where its sign is known. The result is checked on
+    both sides. If the check fails (or `f` has no such attributes), a
+    warning is logged and the root is found by
+    :func:`~unified_ci.tools.bisect` within `xtol`. Where the acceptance
+    intervals are not monotonic in `t`, `delta` can change its sign several
+    times within `coarse`, and the crossing nearest to `a` is returned.
+
+    For the limits of :func:`confidence_interval`, this takes about as many
+    :func:`critical_value` evaluations as bisection to `xtol=1e-2` and a
+    quarter of bisection to the same precision.
+
+    Parameters
+    ----------
+    f : callable
+        The `delta` function of :func:`mk_delta_func` (or a wrapper with
+        its attributes), callable as `f(x, *args)`.
+    a, b : float
+        The initial interval, `f(a)` and `f(b)` must have different signs.
+    xtol : float, optional
+        The accuracy of the fallback bisection.
+    coarse : float, optional
+        The width of the bracket the piece-wise search starts from.
+    maxiter : int, optional
+        The maximum number of pieces walked.
+    args : tuple, optional
+        Additional arguments for `f`.
+
+    Returns
+    -------
+    r : float
+        The limit, the edge of the region where `f` has the sign of
+        `f(a)` (like :func:`~unified_ci.tools.bisect`).
+    """
+    if args is None:
+        args = ()
+    try:
+        n, bg, alpha = f.n, f.b, f.alpha
+    except AttributeError:
+        return _breakpoint_fallback(f, a, b, xtol, args, 'no delta parameters')
+    if bg <= 0.0:
+        return _breakpoint_fallback(f, a, b, xtol, args, 'no background')
+
+    fa = f(a, *args)
+    while abs(b - a) > coarse:
+        t = 0.5 * (a + b)
+        if np.sign(f(t, *args)) == np.sign(fa):
+            a = t
+        else:
+            b = t
+
+    # Like `bisect`, return the edge of the region where `f` has the sign of `f(a)`.
+    sa = np.sign(fa)
+    s = np.sign(b - a)
+    t = a
+    r = None
+    for _ in range(maxiter):
+        st = _critical_state(bg, t + 1e-9 * (b - a), alpha)
+        if np.sign(f(t + 1e-9 * (b - a), *args)) != sa:
+            r = t
+            break
+        end = _piece_end(st, bg, alpha, t, b)
+        # The critical value is the likelihood ratio of `k` (or `m`). If `n`
+        # is the last accepted `m`, the root is the swap of `k` and `m`,
+        # which changes the state: it's checked in the next piece.
+        k = st.m if st.k is None else st.k
+        if n != k and n != st.m:
+            root = _lr_crossing(n, k, bg)
+            if 0.0 < s * (root - t) and s * (root - end) <= 0.0:
+                r = root
+                break
+        if end == b:
+            break
+        t = end
+
+    eps = 1e-9 * (1.0 + abs(b - a))
+    if r is None:
+        return _breakpoint_fallback(f, a, b, xtol, args, 'no root found in {} pieces'.format(maxiter))
+    if np.sign(f(r - s * eps, *args)) != sa or np.sign(f(r + s * eps, *args)) == sa:
+        return _breakpoint_fallback(f, a, b, xtol, args, 'check of root {} failed'.format(r))
+    return r
+
+
+def lower_limit(n, b, clvl, delta=None, solver=bisect, executor=None, asymptotic=False):
     """Calculate the lower limit of the confidence interval.
 
     Parameters
@@ -201,11 +587,27 @@ def lower_limit(n, b, clvl, delta=None):
     b : float
     clvl : float
     delta : callable, optional
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or
+        :func:`breakpoint_solver`.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements.
+    asymptotic : bool or tuple, optional
+        If `True`, the asymptotic limits are used above the
+        :data:`ASYMPTOTIC_THRESHOLDS`, or above the thresholds
+        `(n_min, b_min)` if given. Disabled by default.
     """
+    if delta is None and _use_asymptotic(n, b, asymptotic):
+        return asymptotic_lower_limit(n, b, clvl)
+
     t_best = fit_theta(n, b)
 
     if delta is None:
         delta = mk_delta_func(n, b, clvl)
+    if executor is not None:
+        solver = partial(ksection, executor=executor)
 
     if t_best == 0.0 or delta(0.0) >= 0.0:
         return 0.0
@@ -216,10 +618,16 @@ def lower_limit(n, b, clvl, delta=None):
         # t0 = optimize.brentq(f, 0, t_best)
         # t0 = optimize.bisect(f, 0, t_best, xtol=1e-4)
         # So we have to use a hand-crafted root-finding.
-        return bisect(delta, t_best, 0)
+        return solver(delta, t_best, 0)
 
 
-def upper_limit(n, b, clvl, delta=None):
+def _score_upper_limit(n, b, clvl):
+    """Asymptotic (score interval) estimate of the upper limit."""
+    z = special.ndtri(0.5 * (1.0 + clvl))
+    return n + 0.5*z**2 + z*np.sqrt(n + 0.25*z**2) - b
+
+
+def upper_limit(n, b, clvl, delta=None, solver=bisect, executor=None, asymptotic=False):
     """Calculate the upper limit of the confidence interval.
 
     Parameters
@@ -230,29 +638,49 @@ def upper_limit(n, b, clvl, delta=None):
         The background rate.
     clvl : float
         The confidence level.
+    delta : callable, optional
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or
+        :func:`breakpoint_solver`.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements.
+    asymptotic : bool or tuple, optional
+        If `True`, the asymptotic limits are used above the
+        :data:`ASYMPTOTIC_THRESHOLDS`, or above the thresholds
+        `(n_min, b_min)` if given. Disabled by default.
 
     Returns
     -------
     ul : float
         The upper limits of the confidence interval.
     """
+    if delta is None and _use_asymptotic(n, b, asymptotic):
+        return asymptotic_upper_limit(n, b, clvl)
+
     t_best = fit_theta(n, b)
 
     if delta is None:
         delta = mk_delta_func(n, b, clvl)
+    if executor is not None:
+        solver = partial(ksection, executor=executor)
 
-    u = t_best
-    v = max(1.0, 2*u)
-    while delta(v) >= 0:
-        u = v
-        v = 2*u
-    t1 = bisect(delta, u, v)
+    # Start from the asymptotic (score interval) estimate of the upper limit.
+    guess = max(t_best, _score_upper_limit(n, b, clvl))
+    u, v = upper_bracket(delta, t_best, max(1.0, 2*t_best), guess, 0.25*np.sqrt(n + 1.0))
+    t1 = solver(delta, u, v)
     return t1
 
 
-def confidence_interval(n, b, clvl):
+def confidence_interval(n, b, clvl, solver=bisect, executor=None, asymptotic=False):
     """Calculate the confidence interval for the expectation value.
 
+    With `asymptotic` enabled and `n` and `b` both above its thresholds,
+    the limits are calculated by :func:`asymptotic_confidence_interval`,
+    which deviate from the exact limits by up to
+    :data:`ASYMPTOTIC_TOLERANCE`.
+
     Parameters
     ----------
     n : int
@@ -261,23 +689,576 @@ def confidence_interval(n, b, clvl):
         The background rate.
     clvl : float
         The confidence level.
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or
+        :func:`breakpoint_solver`.
+    executor : object, optional
+        If given, :func:`~unified_ci.tools.ksection` evaluating `delta` in
+        parallel with this executor is used as root finder. See
+        :func:`~unified_ci.tools.ksection` for the requirements.
+    asymptotic : bool or tuple, optional
+        If `True`, the asymptotic limits are used above the
+        :data:`ASYMPTOTIC_THRESHOLDS`, or above the thresholds
+        `(n_min, b_min)` if given. Disabled by default.
 
     Returns
     -------
     ll, ul : float
         The lower and upper limits of the confidence interval.
     """
+    if _use_asymptotic(n, b, asymptotic):
+        return asymptotic_confidence_interval(n, b, clvl)
+
     delta = mk_delta_func(n, b, clvl)
-    t0 = lower_limit(n, b, clvl, delta)
-    t1 = upper_limit(n, b, clvl, delta)
+    t0 = lower_limit(n, b, clvl, delta, solver, executor)
+    t1 = upper_limit(n, b, clvl, delta, solver, executor)
     return t0, t1
 
 
+def _use_asymptotic(n, b, asymptotic):
+    """Check whether `n` and `b` exceed the asymptotic thresholds."""
+    if not asymptotic:
+        return False
+    if asymptotic is True:
+        asymptotic = ASYMPTOTIC_THRESHOLDS
+    return n >= asymptotic[0] and b >= asymptotic[1]
+
+
+def _asymptotic_delta(t, n, b, alpha):
+    """Asymptotic critical value minus `-2log(likelihood ratio)`."""
+    return simple_gaussian.critical_value(t, np.sqrt(b + t), alpha) + 2.0 * log_likelihood_ratio(n, b, t)
+
+
+def asymptotic_lower_limit(n, b, clvl):
+    """Calculate the asymptotic lower limit (see :func:`asymptotic_confidence_interval`)."""
+    alpha = 1.0 - clvl
+    n = n - 0.5
+    t_best = fit_theta(n, b)
+    if t_best == 0.0 or _asymptotic_delta(0.0, n, b, alpha) >= 0.0:
+        return 0.0
+    return optimize.brentq(_asymptotic_delta, 0.0, t_best, args=(n, b, alpha))
+
+
+def asymptotic_upper_limit(n, b, clvl):
+    """Calculate the asymptotic upper limit (see :func:`asymptotic_confidence_interval`)."""
+    alpha = 1.0 - clvl
+    n = n + 0.5
+    u = fit_theta(n, b)
+    step = (special.ndtri(1.0 - 0.5*alpha) + 1.0) * np.sqrt(n + 1.0)
+    v = u + step
+    while _asymptotic_delta(v, n, b, alpha) > 0.0:
+        u, v = v, v + step
+    return optimize.brentq(_asymptotic_delta, u, v, args=(n, b, alpha))
+
+
+def asymptotic_confidence_interval(n, b, clvl):
+    """Calculate the confidence interval in the large-count approximation.
+
+    The measurement `n` is accepted for signal rate `t` if
+    :math:`-2\\log\\Lambda(t)` (see :func:`log_likelihood_ratio`) is below
+    the critical value of a Gaussian measurement with standard deviation
+    :math:`\\sqrt{b+t}` constrained to the positive domain (see
+    :func:`unified_ci.simple_gaussian.critical_value`). Far from the
+    boundary this is Wilks' :math:`\\chi^2_1` quantile. The discreteness of
+    `n` is approximated by a continuity correction of :math:`\\mp 1/2` for
+    the lower and upper limit, and the smooth limits are solved with
+    :func:`scipy.optimize.brentq`.
+
+    The exact limits change in steps with the discrete `n`, so the
+    deviation from them does not vanish for large counts: it is about 0.5
+    (half a count) everywhere and largest where the lower limit departs
+    from zero. Compared to the exact roots (see :func:`breakpoint_solver`)
+    for `b` = 3, 10, 30, ..., 1e5 (steps of about 3x), `n` from
+    `b - 4*sqrt(b)` to `b + 6*sqrt(b)` (every `n` up to `b = 1000`, 41
+    values above) and confidence levels 0.6827, 0.9, 0.95 and 0.99, the
+    maximum deviation is 0.69 (`n=1042, b=1000, clvl=0.9`), within
+    :data:`ASYMPTOTIC_TOLERANCE`. This is far above the accuracy
+    `xtol=1e-2` of the exact limits, which take only a few ms even for
+    `n, b = 1e5`, so :func:`confidence_interval` uses the asymptotic
+    limits only with `asymptotic=True`. Outside of the validated grid,
+    check with :func:`validate_asymptotic`.
+
+    Parameters
+    ----------
+    n : int
+        The measured value.
+    b : float
+        The background rate.
+    clvl : float
+        The confidence level.
+
+    Returns
+    -------
+    ll, ul : float
+        The lower and upper limits of the confidence interval.
+    """
+    return asymptotic_lower_limit(n, b, clvl), asymptotic_upper_limit(n, b, clvl)
+
+
+def validate_asymptotic(n, b, clvl, solver=bisect):
+    """Calculate the exact and the asymptotic confidence interval side by side.
+
+    A warning is logged if they deviate by more than
+    :data:`ASYMPTOTIC_TOLERANCE`.
+
+    Parameters
+    ----------
+    n : int
+        The measured value.
+    b : float
+        The background rate.
+    clvl : float
+        The confidence level.
+    solver : callable, optional
+        The root finder for the exact limits.
+
+    Returns
+    -------
+    exact, approx : tuple of float
+        The exact and the asymptotic confidence interval `(ll, ul)`.
+    """
+    exact = confidence_interval(n, b, clvl, solver, asymptotic=False)
+    approx = asymptotic_confidence_interval(n, b, clvl)
+    dev = np.max(np.abs(np.subtract(exact, approx)))
+    if dev > ASYMPTOTIC_TOLERANCE:
+        logging.warn('asymptotic limits {} deviate by {} from exact limits {} for n={} b={} clvl={}'.format(approx, dev, exact, n, b, clvl))
+    return exact, approx
+
+
+def _confidence_intervals_sorted(ns, b, clvl, solver, asymptotic, xtol=1e-2):
+    """Calculate the confidence intervals for sorted, unique `ns`.
+
+    The limits are monotonic in `n`, so `delta(t) < 0` below the lower
+    limit of the previous `n` and `delta(t) > 0` between the lower limit of
+    `n` and the upper limit of the previous `n` (with a margin of `xtol`,
+    the accuracy of the limits). `delta` is not evaluated in these regions.
+    The search for the upper limit starts from the score estimate corrected
+    by its offset at the previous `n`; :func:`~unified_ci.tools.upper_bracket`
+    keeps the bisection steps unchanged.
+    """
+    ll = np.zeros(len(ns))
+    ul = np.empty(len(ns))
+    for i, n in enumerate(ns):
+        if _use_asymptotic(n, b, asymptotic):
+            ll[i], ul[i] = asymptotic_confidence_interval(n, b, clvl)
+            continue
+        delta = mk_delta_func(n, b, clvl)
+        if i == 0:
+            ll[i] = lower_limit(n, b, clvl, delta, solver)
+            ul[i] = upper_limit(n, b, clvl, delta, solver)
+            continue
+
+        # The wrappers keep the attributes of `delta` for `breakpoint_solver`.
+        neg = ll[i-1] - xtol
+        def delta_lower(t):
+            return -1.0 if 0.0 < t < neg else delta(t)
+        delta_lower.__dict__.update(delta.__dict__)
+        ll[i] = lower_limit(n, b, clvl, delta_lower, solver)
+
+        lo, hi = ll[i] + xtol, ul[i-1] - xtol
+        def delta_upper(t):
+            return 1.0 if lo < t < hi else delta(t)
+        delta_upper.__dict__.update(delta.__dict__)
+        t_best = fit_theta(n, b)
+        offset = ul[i-1] - _score_upper_limit(ns[i-1], b, clvl)
+        guess = max(t_best, _score_upper_limit(n, b, clvl) + offset)
+        u, v = upper_bracket(delta_upper, t_best, max(1.0, 2*t_best), guess, 0.25*np.sqrt(n + 1.0))
+        ul[i] = solver(delta_upper, u, v)
+    return ll, ul
+
+
+def _confidence_intervals_grid(ns, b, clvl, asymptotic):
+    """Calculate the confidence intervals for `ns` with :func:`~unified_ci.tools.bisect_batch`.
+
+    All limits are bisected together, evaluating the critical values of
+    each step with :func:`critical_value_curve`. The brackets are those of
+    the reference searches of :func:`lower_limit` and :func:`upper_limit`
+    (the doubling search for the upper limit is vectorized as well).
+    """
+    alpha = 1.0 - clvl
+    def delta(t, n):
+        return likelihood_ratio(n, b, t) - critical_value_curve(b, t, alpha)
+
+    ll = np.zeros(len(ns))
+    ul = np.empty(len(ns))
+    asym = np.array([_use_asymptotic(n, b, asymptotic) for n in ns], dtype=bool)
+    for i in np.flatnonzero(asym):
+        ll[i], ul[i] = asymptotic_confidence_interval(ns[i], b, clvl)
+    idx = np.flatnonzero(~asym)
+    if not idx.size:
+        return ll, ul
+    ns = ns[idx]
+    t_best = fit_theta(ns, b)
+
+    sel = np.flatnonzero(t_best > 0.0)
+    sel = sel[delta(np.zeros(sel.size), ns[sel]) < 0.0]
+    if sel.size:
+        ll[idx[sel]] = bisect_batch(delta, t_best[sel], 0.0, args=(ns[sel],))
+
+    u = t_best.copy()
+    v = np.fmax(1.0, 2*t_best)
+    up = np.arange(ns.size)
+    while up.size:
+        up = up[delta(v[up], ns[up]) >= 0.0]
+        u[up] = v[up]
+        v[up] *= 2.0
+    ul[idx] = bisect_batch(delta, u, v, args=(ns,))
+    return ll, ul
+
+
+def confidence_interval_batch(n, b, clvl, solver=bisect, asymptotic=False):
+    """Calculate the confidence intervals for arrays of measurements.
+
+    The inputs are reduced to the unique `(n, b, clvl)` combinations and
+    grouped by `(b, clvl)`. With :func:`~unified_ci.tools.bisect`, the
+    limits of each group are bisected together with
+    :func:`~unified_ci.tools.bisect_batch` and :func:`critical_value_curve`.
+    With other solvers, the critical values are shared (see
+    :func:`critical_value`) and the root searches for increasing `n` skip
+    the regions already known from the limits of the previous `n`.
+
+    With :func:`~unified_ci.tools.bisect`, the results are identical to
+    :func:`confidence_interval` if `delta(t)` changes its sign only once
+    at each limit. Where the acceptance intervals are not monotonic in `t`,
+    another crossing of `delta` may be found.
+
+    Parameters
+    ----------
+    n : int or ndarray of int
+        The measured values.
+    b : float or ndarray
+        The background rates.
+    clvl : float or ndarray
+        The confidence levels. `n`, `b` and `clvl` are broadcast against
+        each other.
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or
+        :func:`breakpoint_solver`.
+    asymptotic : bool or tuple, optional
+        If `True`, the asymptotic limits are used above the
+        :data:`ASYMPTOTIC_THRESHOLDS`, or above the thresholds
+        `(n_min, b_min)` if given. Disabled by default.
+
+    Returns
+    -------
+    ll, ul : ndarray
+        The lower and upper limits of the confidence intervals.
+    """
+    n, b, clvl = np.broadcast_arrays(np.asarray(n), np.asarray(b, dtype=float),
+                                     np.asarray(clvl, dtype=float))
+    keys = np.column_stack((b.ravel(), clvl.ravel(), n.ravel()))
+    # sort by (b, clvl, n) and reduce to the unique combinations
+    order = np.lexsort(keys.T[::-1])
+    keys = keys[order]
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    uniq = keys[new]
+    inverse = np.empty(len(keys), dtype=int)
+    inverse[order] = np.cumsum(new) - 1
+
+    ll = np.empty(len(uniq))
+    ul = np.empty(len(uniq))
+    start = np.flatnonzero(np.r_[True, np.any(uniq[1:, :2] != uniq[:-1, :2], axis=1), True])
+    for i, j in zip(start[:-1], start[1:]):
+        ns = uniq[i:j, 2].astype(int)
+        if solver is bisect:
+            ll[i:j], ul[i:j] = _confidence_intervals_grid(ns, uniq[i, 0], uniq[i, 1], asymptotic)
+        else:
+            ll[i:j], ul[i:j] = _confidence_intervals_sorted(ns, uniq[i, 0], uniq[i, 1], solver, asymptotic)
+
+    return ll[inverse].reshape(n.shape), ul[inverse].reshape(n.shape)
+
+
+#: A discontinuity of a limit found by :func:`confidence_interval_scan`:
+#: the `limit` (0 for the lower, 1 for the upper limit) changes from `lo`
+#: at background rate `b_lo` to `hi` at `b_hi`.
+LimitJump = namedtuple('LimitJump', 'limit b_lo b_hi lo hi')
+
+
+def _is_jump(b0, b1, y0, y1, jump):
+    """Check whether a limit changes by more than `jump` beyond a slope in `[-1, 0]`."""
+    dy = y1 - y0
+    return dy > jump or dy < -abs(b1 - b0) - jump
+
+
+def _scan_limit(n, b, clvl, limit, guess, step, solver, asymptotic):
+    """Calculate the lower (`limit == 0`) or upper limit starting at `guess`.
+
+    The root search starts from the sub-interval of width `step` around
+    `guess` of the bisection tree of the scalar search (see
+    :func:`~unified_ci.tools.bisection_bracket`). If `guess` is `None`, the
+    scalar search is used.
+    """
+    if _use_asymptotic(n, b, asymptotic):
+        return (asymptotic_lower_limit, asymptotic_upper_limit)[limit](n, b, clvl)
+
+    delta = mk_delta_func(n, b, clvl)
+    t_best = fit_theta(n, b)
+    if limit == 0:
+        if guess is None:
+            return lower_limit(n, b, clvl, delta, solver)
+        if t_best == 0.0 or delta(0.0) >= 0.0:
+            return 0.0
+        u, v = bisection_bracket(delta, t_best, 0.0, min(max(guess, 0.0), t_best), step)
+    else:
+        if guess is None:
+            return upper_limit(n, b, clvl, delta, solver)
+        u, v = upper_bracket(delta, t_best, max(1.0, 2*t_best), max(guess, t_best), step)
+    return solver(delta, u, v)
+
+
+def _extrapolate(bs, ys, i, jump):
+    """Extrapolate the limits `ys[:i]` linearly to `bs[i]`."""
+    if i == 0:
+        return None
+    guess = ys[i-1]
+    if i > 1 and bs[i-1] > bs[i-2] and not _is_jump(bs[i-2], bs[i-1], ys[i-2], ys[i-1], jump):
+        guess += (ys[i-1] - ys[i-2]) * (bs[i] - bs[i-1]) / (bs[i-1] - bs[i-2])
+    return guess
+
+
+def confidence_interval_scan(n, bs, clvl, solver=bisect, jump=0.05, btol=1e-3, asymptotic=False):
+    """Calculate the confidence intervals of `n` for a sorted array of background rates.
+
+    The limits are tracked along `bs`: each root search starts from the
+    limit extrapolated from the previous background rates, and descends
+    directly to a sub-interval of the scalar bisection tree (see
+    :func:`~unified_ci.tools.bisection_bracket` and
+    :func:`~unified_ci.tools.upper_bracket`). With
+    :func:`~unified_ci.tools.bisect`, the results are identical to
+    :func:`confidence_interval` if `delta(t)` changes its sign only once
+    at each limit.
+
+    The limits decrease with `b` by a slope between 0 and -1, except at
+    discontinuities where the acceptance intervals gain or lose a
+    measurement. Where a limit changes between neighbouring `bs` by more
+    than `jump` beyond this range, the interval is bisected in `b` down to
+    a width of `btol` to locate the discontinuity. Only these intervals are
+    refined.
+
+    Parameters
+    ----------
+    n : int
+        The measured value.
+    bs : ndarray
+        The background rates in ascending order.
+    clvl : float
+        The confidence level.
+    solver : callable, optional
+        The root finder, :func:`~unified_ci.tools.bisect` or
+        :func:`breakpoint_solver`.
+    jump : float, optional
+        The smallest change of a limit considered a discontinuity, should
+        be above the accuracy of the limits.
+    btol : float, optional
+        The accuracy of the located discontinuities in `b`.
+    asymptotic : bool or tuple, optional
+        If `True`, the asymptotic limits are used above the
+        :data:`ASYMPTOTIC_THRESHOLDS`, or above the thresholds
+        `(n_min, b_min)` if given. Disabled by default.
+
+    Returns
+    -------
+    ll, ul : ndarray
+        The lower and upper limits of the confidence intervals at `bs`.
+    jumps : list of LimitJump
+        The located discontinuities, ordered by limit and `b`.
+    """
+    bs = np.asarray(bs, dtype=float)
+    if np.any(np.diff(bs) < 0.0):
+        raise ValueError("background rates must be sorted in ascending order")
+
+    limits = np.empty((2, bs.size))
+    jumps = []
+    for limit, ys in enumerate(limits):
+        for i, b in enumerate(bs):
+            step = jump + (b - bs[i-1] if i > 0 else 0.0)
+            ys[i] = _scan_limit(n, b, clvl, limit, _extrapolate(bs, ys, i, jump), step,
+                                solver, asymptotic)
+
+        # Bisect the intervals with discontinuities, left to right.
+        todo = [(bs[i], bs[i+1], ys[i], ys[i+1]) for i in range(bs.size - 2, -1, -1)]
+        while todo:
+            b0, b1, y0, y1 = todo.pop()
+            if not _is_jump(b0, b1, y0, y1, jump):
+                continue
+            if b1 - b0 <= btol:
+                jumps.append(LimitJump(limit, b0, b1, y0, y1))
+                continue
+            bm = 0.5 * (b0 + b1)
+            ym = _scan_limit(n, bm, clvl, limit, y0, jump + bm - b0, solver, asymptotic)
+            todo.append((bm, b1, ym, y1))
+            todo.append((b0, bm, y0, ym))
+
+    return limits[0], limits[1], jumps
+
+
+def acceptance_interval(b, t, alpha):
+    """Calculate the acceptance interval `[n1, n2]` for signal rate `t`.
+
+    The measurement `n` is accepted if its likelihood ratio is above
+    :func:`critical_value`, i.e. if `delta(t) > 0` like in the root finding
+    of the limits. As the likelihood ratio is unimodal in `n`, the accepted
+    `n` form an interval.
+
+    Parameters
+    ----------
+    b : float
+        Background rate.
+    t : float
+        Signal rate.
+    alpha : float
+        Lower-tail probability (:math:`\alpha = 1 - clvl`).
+
+    Returns
+    -------
+    n1, n2 : int
+        The smallest and largest accepted `n`.
+    """
+    crit = critical_value(b, t, alpha)
+    n_mode = int(np.floor(b + t))
+    width = int(np.ceil(4.0 * np.sqrt(b + t))) + 4
+    while True:
+        lo = max(0, n_mode - width)
+        ns = np.arange(lo, n_mode + width + 1)
+        acc = np.flatnonzero(likelihood_ratio(ns, b, t) > crit)
+        if (lo == 0 or acc[0] > 0) and acc[-1] < ns.size - 1:
+            return int(ns[acc[0]]), int(ns[acc[-1]])
+        width *= 2
+
+
+class PoissonBelt(object):
+    """The confidence belt for fixed background rate and confidence level.
+
+    The acceptance intervals :math:`[n_1(t), n_2(t)]` (see
+    :func:`acceptance_interval`) are scanned on a grid of signal rates with
+    spacing `step`, and every grid interval where they change is bisected
+    until the jump is located within `tol`. The limits for all
+    `n = 0..n_max` are then read off the belt at once: the lower (upper)
+    limit is the smallest (largest) scanned `t` where `n` is accepted, i.e.
+    like the limits of :func:`confidence_interval` they are on the accepted
+    side of the jump. Limits for `n > n_max` fall back to
+    :func:`lower_limit` and :func:`upper_limit`.
+
+    Where `delta(t) == 0` on a whole interval, `n` is not accepted, which
+    reproduces several tabulated F+C upper limits missed by the root
+    finding. Like any scan, the belt can miss acceptance intervals shorter
+    than `step`.
+
+    Parameters
+    ----------
+    b : float
+        The background rate.
+    clvl : float
+        The confidence level.
+    n_max : int, optional
+        The largest tabulated measurement.
+    step : float, optional
+        The spacing of the scan in `t`.
+    tol : float, optional
+        The absolute accuracy of the jump points.
+
+    Examples
+    --------
+    >>> belt = PoissonBelt(3.0, 0.9)
+    >>> ll, ul = belt.confidence_interval(np.arange(11))
+    """
+    def __init__(self, b, clvl, n_max=20, step=0.05, tol=1e-4):
+        self.b = b
+        self.clvl = clvl
+        self.n_max = n_max
+        self.step = step
+        self.tol = tol
+
+        alpha = 1.0 - clvl
+        ts = [0.0]
+        acc = [acceptance_interval(b, 0.0, alpha)]
+        # `n1(t)` is not monotonic, scan one step further
+        while acc[-1][0] <= n_max + 1:
+            ts.append(len(ts) * step)
+            acc.append(acceptance_interval(b, ts[-1], alpha))
+
+        belt = [(ts[0], acc[0])]
+        for i in range(1, len(ts)):
+            belt.extend(self._refine(ts[i-1], acc[i-1], ts[i], acc[i], alpha))
+            belt.append((ts[i], acc[i]))
+        self.t = np.array([ti for ti, _ in belt])
+        self.n1, self.n2 = np.array([ai for _, ai in belt]).T
+
+        ns = np.arange(n_max + 1)[:, np.newaxis]
+        accepted = (self.n1 <= ns) & (ns <= self.n2)
+        self._ll = self.t[np.argmax(accepted, axis=1)]
+        # Like in `lower_limit`, `n` with `delta(0) >= 0` have lower limit 0.
+        self._ll[likelihood_ratio(ns[:, 0], b, 0.0) >= critical_value(b, 0.0, alpha)] = 0.0
+        self._ul = self.t[-1 - np.argmax(accepted[:, ::-1], axis=1)]
+
+    def _refine(self, ta, acc_a, tb, acc_b, alpha):
+        """Bisect `[ta, tb]` until all jumps of the acceptance interval are within `tol`."""
+        if acc_a == acc_b or tb - ta <= self.tol:
+            return []
+        tm = 0.5 * (ta + tb)
+        acc_m = acceptance_interval(self.b, tm, alpha)
+        return (self._refine(ta, acc_a, tm, acc_m, alpha) + [(tm, acc_m)]
+                + self._refine(tm, acc_m, tb, acc_b, alpha))
+
+    def _lookup(self, n, table, fallback):
+        n = np.asarray(n)
+        out = np.array(table[np.clip(n, 0, self.n_max)], ndmin=1)
+        high = np.array(n > self.n_max, ndmin=1)
+        if high.any():
+            out[high] = [fallback(ni, self.b, self.clvl) for ni in np.array(n, ndmin=1)[high]]
+        return out.reshape(n.shape)[()]
+
+    def lower_limit(self, n):
+        """Calculate the lower limit(s) for measurement(s) `n`.
+
+        Parameters
+        ----------
+        n : int or ndarray of int
+            The measured value(s).
+
+        Returns
+        -------
+        ll : float or ndarray
+            The lower limit(s) of the confidence interval.
+        """
+        return self._lookup(n, self._ll, lower_limit)
+
+    def upper_limit(self, n):
+        """Calculate the upper limit(s) for measurement(s) `n`.
+
+        Parameters
+        ----------
+        n : int or ndarray of int
+            The measured value(s).
+
+        Returns
+        -------
+        ul : float or ndarray
+            The upper limit(s) of the confidence interval.
+        """
+        return self._lookup(n, self._ul, upper_limit)
+
+    def confidence_interval(self, n):
+        """Calculate the confidence interval(s) for measurement(s) `n`.
+
+        Parameters
+        ----------
+        n : int or ndarray of int
+            The measured value(s).
+
+        Returns
+        -------
+        ll, ul : float or ndarray
+            The lower and upper limits of the confidence interval.
+        """
+        return self.lower_limit(n), self.upper_limit(n)
+
+
 ##############################
 ## TESTS
 from .tools import conservative_quantile
 import itertools
-import operator
 
 
 
@@ -299,7 +1280,7 @@ def critical_theta_mc(b, t, alpha, N_mc):
     n_sample = np.random.poisson(t+b, size=N_mc)
     lr = likelihood_ratio(n_sample, b, t)
 
-    return conservative_quantile(lr, -alpha)[0]
+    return conservative_quantile(lr, -alpha)
 
 # critical_value = lambda b, t, alpha: critical_theta_mc(b, t, alpha, 10000)
 
@@ -4,10 +4,29 @@ Common tools for interval estimation
 
 .. autofunction:: bisect
 
+.. autofunction:: bisect_batch
+
+.. autofunction:: illinois_batch
+
+.. autofunction:: ksection
+
+.. autofunction:: upper_bracket
+
+.. autofunction:: bisection_bracket
+
 .. autofunction:: conservative_quantile
+
+.. autoclass:: QuantileAccumulator
+   :members:
+
+.. autofunction:: memoize
 """
+import multiprocessing
+import threading
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
 import numpy as np
-from scipy.stats import itemfreq
 
 def bisect(f, a, b, xtol=1e-2, ftol=1e-6, args=None):
     """Bisection search for root of `f` in interval `[a, b]`.
@@ -55,7 +74,381 @@ def bisect(f, a, b, xtol=1e-2, ftol=1e-6, args=None):
 
     return a
 
-def conservative_quantile(x, p):
+def bisect_batch(f, a, b, xtol=1e-2, ftol=1e-6, args=None):
+    """Vectorized bisection search for roots of `f` in intervals `[a, b]`.
+
+    All intervals are bisected together, one NumPy step at a time. Like
+    :func:`bisect`, the edge nearest to `a` is returned if there's a
+    sub-intervall where `f(x) == 0`. Converged elements are frozen and not
+    evaluated any more.
+
+    Parameters
+    ----------
+    f : callable
+        Vectorized function callable as `f(x, *args)` with 1-dim array `x`,
+        returning an array of the same shape.
+    a, b : float or ndarray
+        The initial intervals for root search. `a` and `b` are broadcast
+        against each other. `f(a)` and `f(b)` must have opposite signs
+        element-wise.
+    xtol, ftol : float, optimal
+        Absolute convergence criteria, applied element-wise (see
+        :func:`bisect`).
+    args : tuple, optional
+        Additional arguments for `f`. Array arguments are broadcast against
+        `a` and `b` and only the elements matching the evaluated `x` are
+        passed, scalars are passed as-is.
+
+    Returns
+    -------
+    r : ndarray
+        The roots nearest to `a`, with the broadcast shape of `a`, `b` and
+        the array arguments.
+    """
+    shape, a, b, fa, fb, f_at = _prepare_batch(f, a, b, args)
+
+    active = (np.abs(a - b) > xtol) & (np.abs(fa - fb) > ftol)
+    idx = np.flatnonzero(active)
+    while idx.size:
+        t = 0.5 * (a[idx] + b[idx])
+        ft = f_at(t, idx)
+        _update_batch(idx, t, ft, a, b, fa, fb)
+
+        keep = (np.abs(a[idx] - b[idx]) > xtol) & (np.abs(fa[idx] - fb[idx]) > ftol)
+        idx = idx[keep]
+
+    return a.reshape(shape)
+
+def _prepare_batch(f, a, b, args):
+    """Broadcast the brackets of a batch root search and evaluate their ends.
+
+    Returns the broadcast shape, the flat brackets `a`, `b`, the function
+    values `fa`, `fb` and `f_at(x, idx)` evaluating `f` with the arguments
+    of elements `idx`.
+    """
+    if args is None:
+        args = ()
+
+    shape = np.broadcast(a, b, *args).shape
+    a = np.broadcast_to(np.asarray(a, dtype=float), shape).ravel().copy()
+    b = np.broadcast_to(np.asarray(b, dtype=float), shape).ravel().copy()
+    args = tuple(np.broadcast_to(arg, shape).ravel() if np.ndim(arg) > 0 else arg
+                 for arg in args)
+
+    def f_at(x, idx):
+        return np.asarray(f(x, *(arg[idx] if np.ndim(arg) > 0 else arg
+                                 for arg in args)), dtype=float)
+
+    idx = np.arange(a.size)
+    fa = f_at(a, idx)
+    fb = f_at(b, idx)
+    bad = np.sign(fa) == np.sign(fb)
+    if bad.any():
+        i = np.flatnonzero(bad)[0]
+        raise ValueError("f(a) and f(b) must have opposite sign: f(%r)=%r  f(%r)=%r" % (a[i], fa[i], b[i], fb[i]))
+    return shape, a, b, fa, fb, f_at
+
+def _update_batch(idx, t, ft, a, b, fa, fb):
+    """Replace the bracket ends of elements `idx` like :func:`bisect`.
+
+    Returns whether `a` was replaced.
+    """
+    same = np.sign(ft) == np.sign(fa[idx])
+    ia = idx[same]
+    ib = idx[~same]
+    a[ia] = t[same]
+    fa[ia] = ft[same]
+    b[ib] = t[~same]
+    fb[ib] = ft[~same]
+    return same
+
+def illinois_batch(f, a, b, xtol=1e-2, ftol=1e-6, args=None):
+    """Vectorized Illinois search for roots of `f` in intervals `[a, b]`.
+
+    Needs fewer evaluations of `f` than :func:`bisect_batch` if `f` is
+    smooth, with the same interface. The brackets are updated exactly
+    like in :func:`bisect_batch`, so the edge nearest to `a` is returned if
+    there's a sub-intervall where `f(x) == 0`. The trial points are
+    interpolated linearly between the bracket ends, where the function
+    value of an end retained twice in a row is halved (Illinois
+    modification). A bisection step is done if the interpolation is not
+    inside the bracket (e.g. next to a plateau) or if the bracket did not
+    halve within two steps.
+
+    Parameters
+    ----------
+    f : callable
+        Vectorized function callable as `f(x, *args)` (see
+        :func:`bisect_batch`).
+    a, b : float or ndarray
+        The initial intervals for root search (see :func:`bisect_batch`).
+    xtol, ftol : float, optimal
+        Absolute convergence criteria, applied element-wise (see
+        :func:`bisect`). For smooth `f` and small `xtol`, `ftol` should be
+        0.
+    args : tuple, optional
+        Additional arguments for `f` (see :func:`bisect_batch`).
+
+    Returns
+    -------
+    r : ndarray
+        The roots nearest to `a`, with the broadcast shape of `a` and `b`.
+    """
+    shape, a, b, fa, fb, f_at = _prepare_batch(f, a, b, args)
+
+    # function values used for interpolation
+    wa = fa.copy()
+    wb = fb.copy()
+    # +1 (-1) if `a` (`b`) was replaced in the previous step
+    side = np.zeros(a.size, dtype=int)
+    # bracket widths of the previous two steps
+    w1 = np.full(a.size, np.inf)
+    w2 = np.full(a.size, np.inf)
+
+    active = (np.abs(a - b) > xtol) & (np.abs(fa - fb) > ftol)
+    idx = np.flatnonzero(active)
+    while idx.size:
+        ai, bi = a[idx], b[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (ai * wb[idx] - bi * wa[idx]) / (wb[idx] - wa[idx])
+        width = np.abs(ai - bi)
+        bisect_step = ~((t - ai) * (t - bi) < 0.0) | (width > 0.5 * w2[idx])
+        t[bisect_step] = 0.5 * (ai + bi)[bisect_step]
+        w2[idx] = w1[idx]
+        w1[idx] = width
+        ft = f_at(t, idx)
+
+        same = _update_batch(idx, t, ft, a, b, fa, fb)
+        ia = idx[same]
+        ib = idx[~same]
+        # Halve the function value of an end retained twice in a row.
+        wa[ia] = ft[same]
+        wb[ib] = ft[~same]
+        wb[ia[side[ia] == 1]] *= 0.5
+        wa[ib[side[ib] == -1]] *= 0.5
+        side[ia] = 1
+        side[ib] = -1
+
+        keep = (np.abs(a[idx] - b[idx]) > xtol) & (np.abs(fa[idx] - fb[idx]) > ftol)
+        idx = idx[keep]
+
+    return a.reshape(shape)
+
+class _Caller(object):
+    """Picklable wrapper calling `f(x, *args)` for use with executors."""
+    def __init__(self, f, args):
+        self.f = f
+        self.args = args
+
+    def __call__(self, x):
+        return self.f(x, *self.args)
+
+def _n_workers(executor):
+    """The number of workers of `executor`, or the number of CPUs if unknown."""
+    # `multiprocessing` pools and `concurrent.futures` executors
+    for attr in ('_processes', '_max_workers'):
+        n = getattr(executor, attr, None)
+        if n:
+            return n
+    return multiprocessing.cpu_count()
+
+def ksection(f, a, b, k=None, executor=None, xtol=1e-2, ftol=1e-6, args=None):
+    """Parallel k-section search for root of `f` in interval `[a, b]`.
+
+    In each round `f` is evaluated at `k` equidistant interior points of the
+    bracket at once, which shrinks the bracket by a factor of `k+1`. Like
+    :func:`bisect`, the edge nearest to `a` is returned if there's a
+    sub-intervall where `f(x) == 0`. For `k=1` this is :func:`bisect`.
+
+    Parameters
+    ----------
+    f : callable
+        Scalar function callable as `f(x, *args)`.
+    a, b : float
+        The initial interval for root search. `f(a)` and `f(b)` must have
+        opposite signs.
+    k : int, optional
+        The number of interior points per round. Defaults to the number of
+        workers of `executor` (the number of CPUs if it can't be
+        determined) if given and to 1 otherwise.
+    executor : object, optional
+        Object with a `map(func, iterable)` method used to evaluate the
+        interior points, e.g. a :class:`multiprocessing.pool.ThreadPool`, a
+        :class:`multiprocessing.Pool` or a `concurrent.futures` executor.
+        Process pools require `f` and `args` to be picklable, i.e. module
+        level functions or class instances instead of closures, like the
+        `delta` functions of the interval modules. If `None`, the points are
+        evaluated sequentially.
+    xtol, ftol : float, optimal
+        Absolute convergence criteria (see :func:`bisect`).
+    args : tuple, optional
+        Additional arguments for `f`.
+
+    Returns
+    -------
+    r : float
+        The root nearest to `a`.
+    """
+    if args is None:
+        args = ()
+    if k is None:
+        k = 1 if executor is None else _n_workers(executor)
+    mapper = map if executor is None else executor.map
+    call = _Caller(f, args)
+
+    fa = f(a, *args)
+    fb = f(b, *args)
+    if np.sign(fa) == np.sign(fb):
+        raise ValueError("f(a) and f(b) must have opposite sign: f(%r)=%r  f(%r)=%r" % (a, fa, b, fb))
+
+    fractions = np.arange(1, k+1) / (k + 1.0)
+    while abs(a-b) > xtol and abs(fa - fb) > ftol:
+        ts = a + (b - a) * fractions
+        fts = list(mapper(call, ts))
+        # the first interior point with sign different from `f(a)`
+        for t, ft in zip(ts, fts):
+            if np.sign(ft) != np.sign(fa):
+                b = t
+                fb = ft
+                break
+            a = t
+            fa = ft
+
+    return a
+
+def upper_bracket(f, lower, upper, guess, step, origin=0.0, strict=False, args=None):
+    """Predict a tight bracket for the root of `f` above `lower`.
+
+    The reference search doubles the interval `[lower, upper]` away from
+    `origin`::
+
+        u, v = lower, upper
+        while f(v) >= 0:    # `f(v) > 0` if `strict`
+            u, v = v, origin + 2*(v - origin)
+
+    and bisects `[u, v]` afterwards. Instead, this function jumps directly to
+    the doubling interval containing the estimate `guess` and checks its
+    edges. It then descends the bisection tree of that interval to the
+    sub-interval of width `<= step` containing `guess`. Only the end points
+    of this sub-interval are evaluated; if they do not bracket the root, the
+    search backs up the bisection tree.
+
+    As the returned interval is one the reference bisection passes through,
+    :func:`bisect` on it returns the identical result if `f` changes sign
+    only once above `lower`.
+
+    Parameters
+    ----------
+    f : callable
+        Scalar function callable as `f(x, *args)`.
+    lower, upper : float
+        The initial interval of the doubling search.
+    guess : float
+        (Asymptotic) estimate of the root.
+    step : float
+        The targeted bracket width, should be of the order of the
+        uncertainty of `guess`.
+    origin : float, optional
+        The fix point of the doubling.
+    strict : bool, optional
+        Whether `f(x) == 0` continues the doubling search.
+    args : tuple, optional
+        Additional arguments for `f`.
+
+    Returns
+    -------
+    u, v : float
+        The bracket.
+    """
+    if args is None:
+        args = ()
+
+    def grid(j):
+        if j < 0:
+            return lower
+        return origin + (upper - origin) * 2.0**j
+
+    def above(fx):
+        return fx > 0 if strict else fx >= 0
+
+    # Doubling stage: start with the interval containing `guess` and move
+    # down or up the doubling sequence until it brackets the root.
+    j = 0
+    while grid(j) < guess:
+        j += 1
+    fu = f(grid(j-1), *args)
+    while j > 0 and not above(fu):
+        j -= 1
+        fu = f(grid(j-1), *args)
+    fv = f(grid(j), *args)
+    while above(fv):
+        j += 1
+        fu = fv
+        fv = f(grid(j), *args)
+    u = grid(j-1)
+    v = grid(j)
+
+    return bisection_bracket(f, u, v, guess, step, fa=fu, args=args)
+
+def bisection_bracket(f, a, b, guess, step, fa=None, args=None):
+    """Predict a tight bracket for :func:`bisect` on `[a, b]`.
+
+    The bisection tree of `[a, b]` is descended towards the estimate
+    `guess` to the sub-interval of width `<= step`. Only the end points of
+    this sub-interval are evaluated; if they do not bracket the root as
+    seen from :func:`bisect` starting at `a` (`sign(f) == sign(f(a))` at
+    the end point towards `a`, and differing at the other), the search
+    backs up the bisection tree. `a` may be above `b`.
+
+    As the returned interval is one the reference bisection passes through,
+    :func:`bisect` on it returns the identical result if `f` changes sign
+    only once in `[a, b]`.
+
+    Parameters
+    ----------
+    f : callable
+        Scalar function callable as `f(x, *args)`.
+    a, b : float
+        The interval of the reference bisection.
+    guess : float
+        Estimate of the root.
+    step : float
+        The targeted bracket width.
+    fa : float, optional
+        `f(a)`, if already known.
+    args : tuple, optional
+        Additional arguments for `f`.
+
+    Returns
+    -------
+    u, v : float
+        The bracket, with `u` towards `a`.
+    """
+    if args is None:
+        args = ()
+    if fa is None:
+        fa = f(a, *args)
+
+    # Descend the bisection tree of `[a, b]` towards `guess`.
+    path = []
+    u, v = a, b
+    while abs(v - u) > step:
+        t = 0.5 * (u + v)
+        if (guess < t) == (u < v):
+            v = t
+        else:
+            u = t
+        path.append((u, v))
+
+    # Back up until the sign changes between the edges.
+    sa = np.sign(fa)
+    while path:
+        u, v = path.pop()
+        if np.sign(f(u, *args)) == sa and np.sign(f(v, *args)) != sa:
+            return u, v
+    return a, b
+
+def conservative_quantile(x, p, axis=-1):
     """Calculate upper/lower tail conservative quantiles.
 
     Conservative lower quantile means that the lower tail probability is
@@ -64,37 +457,243 @@ def conservative_quantile(x, p):
     Conservative upper quantile means that the upper tail probability is
     ensured (:math:`Prob(x_i <= q) <= p <=> Prob(x_i >= q) >= (1-p)`).
 
+    The quantiles are found by selection (:func:`numpy.partition`), i.e. in
+    `O(N)` without sorting the sample.
+
     Parameters
     ----------
     x : ndarray-like
-        The data sample.
+        The data sample(s).
     p : float, ndarray
         The target probabilities `0 <= p <= 1`.
         If `p < 0` conservative upper quantiles are returned.
+    axis : int, optional
+        The axis of `x` along which the samples are stored.
 
     Returns
     -------
-    q : float or ndarray of floats
-        The quantile values.
-    n : int
-        The number of unique values in `x`.
+    q : float or ndarray
+        The quantile values. For array-like `p` the first axis corresponds
+        to `p`, the remaining axes are those of `x` without `axis`.
+
+    Note
+    ----
+    If no sample value satisfies the upper tail condition (i.e. the
+    smallest value alone has a frequency above `abs(p)`), the largest value
+    is returned.
     """
     x = np.asarray(x)
-    if x.ndim != 1:
-        raise ValueError("Data sample must be 1-dim")
-
-    items, freqs = itemfreq(x).T
-    cumfreq = np.cumsum(freqs / x.size)
-    if np.isscalar(p):
-        i = np.where(cumfreq >= abs(p))[0][0]
-        if p < 0 and cumfreq[i] != abs(p):
-            i -= 1
-        return items[i], len(items)
-    else:
-        r = np.empty(len(p), dtype=x.dtype)
-        for k, pk in enumerate(p):
-            i = np.where(cumfreq >= abs(pk))[0][0]
-            if pk < 0 and cumfreq[i] != abs(pk):
-                i -= 1
-            r[k] = items[i]
-        return r, len(items)
+    if x.ndim == 0:
+        raise ValueError("Data sample must be at least 1-dim")
+    x = np.moveaxis(x, axis, -1)
+    N = x.shape[-1]
+
+    ps = np.atleast_1d(np.asarray(p, dtype=float))
+    if ps.ndim != 1:
+        raise ValueError("Probabilities must be scalar or 1-dim")
+    upper = ps < 0
+    ps = np.abs(ps)
+
+    # Lower quantile: the smallest value with at least `p*N` values <= it,
+    # i.e. the order statistic `ceil(p*N)`.
+    # Upper quantile: the largest value with at most `p*N` values <= it,
+    # i.e. the largest value *below* the order statistic `floor(p*N) + 1`.
+    k = np.where(upper, np.floor(ps * N), np.ceil(ps * N) - 1).astype(int)
+    overflow = k >= N
+    k = np.clip(k, 0, N - 1)
+
+    part = np.partition(x, np.unique(k), axis=-1)
+
+    r = np.empty(ps.shape + x.shape[:-1], dtype=x.dtype)
+    for j, (kj, uj) in enumerate(zip(k, upper)):
+        if not uj:
+            r[j] = part[..., kj]
+        elif overflow[j] or kj == 0:
+            r[j] = x.max(axis=-1)
+        else:
+            # `part[..., :kj]` holds all values <= the order statistic `kj`.
+            below = part[..., :kj]
+            is_below = below < part[..., kj, np.newaxis]
+            fill = below.min(axis=-1)[..., np.newaxis]
+            q = np.where(is_below, below, fill).max(axis=-1)
+            r[j] = np.where(is_below.any(axis=-1), q, x.max(axis=-1))
+
+    if np.ndim(p) == 0:
+        return r[0][()]
+    return r
+
+
+class QuantileAccumulator(object):
+    """Streaming version of :func:`conservative_quantile`.
+
+    The sample is added in chunks and kept as an exact histogram of the
+    distinct sample values. For samples with discrete support (e.g.
+    likelihood ratios of Poissonian toy experiments) the memory usage is
+    therefore bounded by the size of the support, not by the sample size.
+    Accumulators filled independently (e.g. by several worker processes)
+    can be merged.
+
+    Attributes
+    ----------
+    values : ndarray
+        The sorted distinct sample values.
+    counts : ndarray of ints
+        The number of occurences of each value in `values`.
+    """
+    def __init__(self, x=None):
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        if x is not None:
+            self.add(x)
+
+    @property
+    def size(self):
+        """The total number of accumulated sample values."""
+        return int(self.counts.sum())
+
+    def add(self, x):
+        """Add a chunk of sample values.
+
+        Parameters
+        ----------
+        x : ndarray-like
+            The sample values, the array is flattened.
+
+        Returns
+        -------
+        self : QuantileAccumulator
+        """
+        values, counts = np.unique(np.asarray(x).ravel(), return_counts=True)
+        self._add_histogram(values, counts)
+        return self
+
+    def merge(self, other):
+        """Add the histogram of another accumulator.
+
+        Parameters
+        ----------
+        other : QuantileAccumulator
+
+        Returns
+        -------
+        self : QuantileAccumulator
+        """
+        self._add_histogram(other.values, other.counts)
+        return self
+
+    def _add_histogram(self, values, counts):
+        if not self.values.size:
+            self.values = values.copy()
+            self.counts = counts.astype(np.int64)
+            return
+        values, inv = np.unique(np.concatenate((self.values, values)),
+                                return_inverse=True)
+        merged = np.zeros(values.size, dtype=np.int64)
+        np.add.at(merged, inv, np.concatenate((self.counts, counts)))
+        self.values = values
+        self.counts = merged
+
+    def quantile(self, p):
+        """Calculate upper/lower tail conservative quantiles.
+
+        The result is identical to :func:`conservative_quantile` applied to
+        the full sample.
+
+        Parameters
+        ----------
+        p : float, ndarray
+            The target probabilities `0 <= p <= 1`.
+            If `p < 0` conservative upper quantiles are returned.
+
+        Returns
+        -------
+        q : float or ndarray of floats
+            The quantile values.
+        """
+        if not self.values.size:
+            raise ValueError("No sample values accumulated")
+        cumcounts = np.cumsum(self.counts)
+        N = cumcounts[-1]
+
+        ps = np.asarray(p, dtype=float)
+        upper = ps < 0
+        target = np.abs(ps) * N
+        # first index with cumulative count >= p*N
+        i = np.searchsorted(cumcounts, np.where(upper, target, np.ceil(target)))
+        i = np.minimum(i, cumcounts.size - 1)
+        # conservative upper quantile: step back unless exactly matched
+        i = np.where(upper & (cumcounts[i] != target), i - 1, i)
+        return self.values[i]
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+def memoize(maxsize=1024, decimals=None):
+    """Decorator for LRU memoization of functions of hashable arguments.
+
+    The decorated function gets the methods `cache_info()`, returning a
+    :class:`CacheInfo` with the hit and miss counters and the cache size,
+    and `cache_clear()`. Decorating a module level function shares the
+    cache between all callers in the process. The cache is thread-safe.
+
+    Parameters
+    ----------
+    maxsize : int or None, optional
+        The maximal number of cached results. If exceeded, the least
+        recently used result is evicted. `None` means unbounded.
+    decimals : int, optional
+        If given, float arguments are rounded to `decimals` decimals to form
+        the cache key, i.e. calls with arguments closer than this are
+        treated as identical and return the result of the first call.
+
+    Examples
+    --------
+    >>> @memoize(maxsize=100)
+    ... def f(x):
+    ...     return x**2
+    >>> f(2.0), f(2.0)
+    (4.0, 4.0)
+    >>> f.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=100, currsize=1)
+    """
+    def decorator(f):
+        cache = OrderedDict()
+        stats = [0, 0]
+        lock = threading.Lock()
+
+        def make_key(args):
+            if decimals is None:
+                return args
+            return tuple(round(a, decimals) if isinstance(a, float) else a for a in args)
+
+        @wraps(f)
+        def wrapper(*args):
+            key = make_key(args)
+            with lock:
+                if key in cache:
+                    stats[0] += 1
+                    r = cache.pop(key)
+                    cache[key] = r
+                    return r
+                stats[1] += 1
+
+            r = f(*args)
+
+            with lock:
+                cache[key] = r
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return r
+
+        def cache_info():
+            with lock:
+                return CacheInfo(stats[0], stats[1], maxsize, len(cache))
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats[:] = [0, 0]
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator